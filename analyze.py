@@ -1,62 +1,304 @@
 import os
 import csv
+import json
 import time
 import datetime
-from persistent_twitter import PersistentTwitter
+from persistent_twitter import PersistentTwitter, TweetTimeout, BudgetExhausted
+from engagement_matrix import EngagementMatrix, matrix_file_for
 
-def analyze_engagement(twitter, look_back=20):
+ENGAGEMENT_TYPES = ['likes', 'replies', 'retweets', 'quotes']
+SCRAPE_HISTORY_FILE = "data/scrape_history.json"
+
+# Hours after which a scrape, or a tweet's fresh-engagement boost, counts half as much
+STALENESS_HALF_LIFE_HOURS = 24
+RECENCY_HALF_LIFE_HOURS = 24
+
+def analyze_engagement(twitter, look_back=20, tweet_timeout=60, retries=1,
+                       budget_seconds=None, budget_navigations=None):
     """
     Analyze a user's tweets and collect engagement data
     
+    With a budget, tweets are scraped in order of expected information gain instead
+    of timeline order, and the run stops early once the budget is used up. Tweets
+    that were not scraped then count with the engagers found the last time they were.
+    
     Args:
         twitter: PersistentTwitter instance
         look_back: Number of tweets to analyze
+        tweet_timeout: Seconds each tweet may take before it is cancelled and retried
+        retries: Number of extra attempts for a tweet that timed out
+        budget_seconds: Optional wall-clock budget for the whole run
+        budget_navigations: Optional budget of page loads for the whole run
         
     Returns:
         Dictionary of engagement data
     """
     print(f"Analyzing the last {look_back} tweets for engagement...")
+    started = time.time()
+    start_navigations = twitter.navigations
+    budget_deadline = started + budget_seconds if budget_seconds else None
     
     # Get the user's tweets
     tweets = twitter.get_profile_tweets(count=look_back)
     print(f"Found {len(tweets)} tweets to analyze")
     
+    # An empty poll is a failed poll, pruning the history to it would erase every stored scrape
+    if not tweets:
+        print("No tweets found, leaving the scrape history and previous results untouched")
+        return {}
+    
+    history = load_scrape_history()
+    if budget_deadline or budget_navigations:
+        tweets = prioritize_tweets(tweets, history)
+        print("Budgeted run, scraping tweets with the most expected new engagement first")
+    
     # Dictionary to store engagement counts
     engagement_data = {}
+    failures = []
     
-    # Process each tweet
-    for i, tweet in enumerate(tweets):
-        print(f"Processing tweet {i+1}/{len(tweets)}: {tweet['url']}")
-        
-        # Get engagement data for this tweet
-        engagements = twitter.get_tweet_engagements(tweet['url'])
-        
-        # Update the engagement data
-        for username in engagements['likes']:
-            if username not in engagement_data:
-                engagement_data[username] = {'likes': 0, 'replies': 0, 'retweets': 0, 'quotes': 0}
-            engagement_data[username]['likes'] += 1
+    # Keep who engaged with which tweet for the co-engagement matrix
+    tweet_engagements = {}
+    
+    # Tweets the budget ran out before
+    skipped = []
+    
+    # Page loads past the budget are refused, even in the middle of a tweet
+    if budget_navigations:
+        twitter.navigation_limit = start_navigations + budget_navigations
+    
+    try:
+        # Process each tweet
+        for i, tweet in enumerate(tweets):
+            if budget_deadline and time.time() >= budget_deadline:
+                print(f"Time budget of {budget_seconds}s used up after {i}/{len(tweets)} tweets")
+                skipped = tweets[i:]
+                break
+            if budget_navigations and twitter.navigations - start_navigations >= budget_navigations:
+                print(f"Navigation budget of {budget_navigations} page loads used up after {i}/{len(tweets)} tweets")
+                skipped = tweets[i:]
+                break
+                
+            print(f"Processing tweet {i+1}/{len(tweets)}: {tweet['url']}")
             
-        for username in engagements['replies']:
-            if username not in engagement_data:
-                engagement_data[username] = {'likes': 0, 'replies': 0, 'retweets': 0, 'quotes': 0}
-            engagement_data[username]['replies'] += 1
+            # Get engagement data for this tweet
+            engagements, attempts = scrape_tweet(twitter, tweet, tweet_timeout, retries, budget_deadline)
+            if engagements is None:
+                print(f"Budget used up while processing tweet {i+1}/{len(tweets)}")
+                skipped = tweets[i:]
+                break
+                
+            if engagements['errors']:
+                failures.append({
+                    'url': tweet['url'],
+                    'attempts': attempts,
+                    'errors': "; ".join(engagements['errors'])
+                })
+            else:
+                history[tweet['url']] = {
+                    'scraped_at': time.time(),
+                    'counts': tweet.get('counts'),
+                    'engagements': {key: list(engagements[key]) for key in ENGAGEMENT_TYPES},
+                }
             
-        for username in engagements['retweets']:
-            if username not in engagement_data:
-                engagement_data[username] = {'likes': 0, 'replies': 0, 'retweets': 0, 'quotes': 0}
-            engagement_data[username]['retweets'] += 1
+            # Update the engagement data
+            add_engagements(engagement_data, engagements)
+            tweet_engagements[tweet['url']] = engagements
+    finally:
+        twitter.navigation_limit = None
+    
+    if skipped:
+        # Fall back on the last complete scrape so skipped tweets don't read as zero engagement
+        known = [tweet for tweet in skipped if 'engagements' in history.get(tweet['url'], {})]
+        for tweet in known:
+            engagements = history[tweet['url']]['engagements']
+            add_engagements(engagement_data, engagements)
+            tweet_engagements[tweet['url']] = engagements
             
-        for username in engagements['quotes']:
-            if username not in engagement_data:
-                engagement_data[username] = {'likes': 0, 'replies': 0, 'retweets': 0, 'quotes': 0}
-            engagement_data[username]['quotes'] += 1
+        print(f"{len(skipped)} tweets not scraped, {len(known)} of them counted from their last scrape")
+        if len(known) < len(skipped):
+            print(f"Saving partial result, {len(skipped) - len(known)} tweets have no engagement data")
+    
+    # Only tweets still in the LOOK_BACK window are worth remembering
+    history = {tweet['url']: history[tweet['url']] for tweet in tweets if tweet['url'] in history}
     
     # Save the data to a CSV file
-    save_engagement_data(engagement_data)
+    engagement_file = save_engagement_data(engagement_data)
+    EngagementMatrix.from_engagements(tweet_engagements).save(matrix_file_for(engagement_file))
+    save_scrape_history(history)
+    if failures:
+        save_failures(failures)
     
     return engagement_data
     
+def load_scrape_history():
+    """Load when each tweet was last scraped, with its counters and engagers at that time"""
+    try:
+        with open(SCRAPE_HISTORY_FILE, "r") as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return {}
+
+def save_scrape_history(history):
+    """Save the scrape history to a JSON file"""
+    os.makedirs('data', exist_ok=True)
+    with open(SCRAPE_HISTORY_FILE, "w") as f:
+        json.dump(history, f)
+
+def estimate_information_gain(tweet, history, weights=None, now=None):
+    """
+    Estimate how much score signal scraping a tweet would add
+    
+    Args:
+        tweet: Tweet dictionary from get_profile_tweets
+        history: Scrape history from load_scrape_history
+        weights: Score of each engagement type, defaults to get_score_weights()
+        now: Current time as a Unix timestamp
+        
+    Returns:
+        Expected gain, higher means scrape sooner
+    """
+    if weights is None:
+        weights = get_score_weights()
+    if now is None:
+        now = time.time()
+        
+    # The repost counter covers quotes too, so score it as the cheaper of the two
+    counter_weights = {
+        'likes': weights['likes'],
+        'replies': weights['replies'],
+        'retweets': min(weights['retweets'], weights['quotes']),
+    }
+    counts = tweet.get('counts') or {}
+    visible = sum((counts.get(key) or 0) * weight for key, weight in counter_weights.items())
+    
+    # Entries without engagers can't stand in for a skipped tweet, so they count as never scraped
+    previous = history.get(tweet['url'])
+    if previous is None or not previous.get('counts') or 'engagements' not in previous:
+        gain = visible
+    else:
+        # Engagement added since the last scrape is new signal
+        gain = sum(
+            max((counts.get(key) or 0) - (previous['counts'].get(key) or 0), 0) * weight
+            for key, weight in counter_weights.items()
+        )
+        
+        # Counters hide churn, so an old scrape slowly becomes worth redoing
+        hours_since_scrape = (now - previous['scraped_at']) / 3600
+        gain += visible * (1 - 0.5 ** (hours_since_scrape / STALENESS_HALF_LIFE_HOURS))
+        
+    # Recent tweets are still gathering engagement
+    if tweet.get('posted_at'):
+        try:
+            posted_at = datetime.datetime.fromisoformat(tweet['posted_at'].replace("Z", "+00:00"))
+            hours_old = max((now - posted_at.timestamp()) / 3600, 0)
+            gain *= 1 + 0.5 ** (hours_old / RECENCY_HALF_LIFE_HOURS)
+        except ValueError:
+            pass
+            
+    return gain
+
+def prioritize_tweets(tweets, history):
+    """
+    Order tweets by expected information gain, highest first
+    
+    Args:
+        tweets: Tweet dictionaries from get_profile_tweets
+        history: Scrape history from load_scrape_history
+        
+    Returns:
+        Sorted list of tweets
+    """
+    weights = get_score_weights()
+    now = time.time()
+    return sorted(tweets, key=lambda tweet: estimate_information_gain(tweet, history, weights, now), reverse=True)
+
+def scrape_tweet(twitter, tweet, tweet_timeout=60, retries=1, budget_deadline=None):
+    """
+    Collect a tweet's engagements, retrying it if the watchdog cancels it
+    
+    Args:
+        twitter: PersistentTwitter instance
+        tweet: Tweet dictionary from get_profile_tweets
+        tweet_timeout: Seconds each attempt may take
+        retries: Number of extra attempts after a timeout
+        budget_deadline: Optional Unix timestamp no attempt may run past
+        
+    Returns:
+        Tuple of the engagements dictionary and the number of attempts made. The
+        engagements are None if the budget ran out before the tweet was collected.
+    """
+    for attempt in range(1, retries + 2):
+        timeout = tweet_timeout
+        cut_by_budget = False
+        if budget_deadline is not None:
+            remaining = budget_deadline - time.time()
+            if remaining <= 0:
+                return None, attempt - 1
+            cut_by_budget = remaining < timeout
+            timeout = min(timeout, remaining)
+                
+        try:
+            engagements = twitter.get_tweet_engagements(
+                tweet['url'], counts=tweet.get('counts'), timeout=timeout
+            )
+            return engagements, attempt
+        except BudgetExhausted as e:
+            print(f"Tweet {tweet['url']} stopped on attempt {attempt}: {e}")
+            return None, attempt
+        except TweetTimeout as e:
+            # A timeout the budget shortened says nothing about the tweet itself
+            if cut_by_budget:
+                print(f"Tweet {tweet['url']} stopped by the time budget on attempt {attempt}")
+                return None, attempt
+            print(f"Tweet {tweet['url']} timed out on attempt {attempt}: {e}")
+            
+    engagements = {key: [] for key in ENGAGEMENT_TYPES}
+    engagements['errors'] = [f"timed out after {retries + 1} attempts"]
+    return engagements, retries + 1
+
+def add_engagements(engagement_data, engagements, delta=1):
+    """
+    Fold one tweet's engagements into the per-user counters
+    
+    Args:
+        engagement_data: Dictionary of engagement data to update in place
+        engagements: Dictionary mapping engagement type to a list of usernames
+        delta: Amount to add per engagement (use -1 to retract engagements)
+    """
+    for engagement_type in ENGAGEMENT_TYPES:
+        for username in engagements.get(engagement_type, []):
+            if username not in engagement_data:
+                engagement_data[username] = {key: 0 for key in ENGAGEMENT_TYPES}
+            engagement_data[username][engagement_type] += delta
+            
+            # Drop users whose engagements have all been retracted
+            if not any(engagement_data[username].values()):
+                del engagement_data[username]
+
+def get_score_weights():
+    """Get the score of each engagement type from env variables"""
+    return {
+        'likes': int(os.getenv("LIKE_SCORE", 1)),
+        'replies': int(os.getenv("REPLY_SCORE", 5)),
+        'retweets': int(os.getenv("RETWEET_SCORE", 10)),
+        'quotes': int(os.getenv("QUOTE_SCORE", 15)),
+    }
+
+def calculate_score(data, weights=None):
+    """
+    Calculate the total engagement score of a single user
+    
+    Args:
+        data: Dictionary of engagement counts for the user
+        weights: Score of each engagement type, defaults to get_score_weights()
+        
+    Returns:
+        Total score
+    """
+    if weights is None:
+        weights = get_score_weights()
+    return sum(data[key] * weights[key] for key in ENGAGEMENT_TYPES)
+
 def save_engagement_data(engagement_data):
     """
     Save engagement data to a CSV file
@@ -79,18 +321,10 @@ def save_engagement_data(engagement_data):
         writer.writeheader()
         
         # Calculate scores based on env variables
-        like_score = int(os.getenv("LIKE_SCORE", 1))
-        reply_score = int(os.getenv("REPLY_SCORE", 5))
-        retweet_score = int(os.getenv("RETWEET_SCORE", 10))
-        quote_score = int(os.getenv("QUOTE_SCORE", 15))
+        weights = get_score_weights()
         
         for username, data in engagement_data.items():
-            total_score = (
-                data['likes'] * like_score +
-                data['replies'] * reply_score +
-                data['retweets'] * retweet_score +
-                data['quotes'] * quote_score
-            )
+            total_score = calculate_score(data, weights)
             
             writer.writerow({
                 'username': username,
@@ -104,16 +338,40 @@ def save_engagement_data(engagement_data):
     print(f"Engagement data saved to {filename}")
     return filename
 
+def save_failures(failures):
+    """
+    Save the tweets that could not be fully collected to a CSV file
+    
+    Args:
+        failures: List of dictionaries with 'url', 'attempts' and 'errors'
+    """
+    os.makedirs('data', exist_ok=True)
+    
+    timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+    filename = f"data/failures_{timestamp}.csv"
+    
+    with open(filename, 'w', newline='') as csvfile:
+        writer = csv.DictWriter(csvfile, fieldnames=['url', 'attempts', 'errors'])
+        writer.writeheader()
+        writer.writerows(failures)
+    
+    print(f"{len(failures)} tweets had errors, details saved to {filename}")
+    return filename
+
 def run_analysis():
     """Run the analysis process"""
     look_back = int(os.getenv("LOOK_BACK", 20))
+    tweet_timeout = int(os.getenv("TWEET_TIMEOUT", 60))
+    retries = int(os.getenv("TWEET_RETRIES", 1))
+    budget_seconds = int(os.getenv("ANALYSIS_BUDGET_SECONDS", 0)) or None
+    budget_navigations = int(os.getenv("ANALYSIS_BUDGET_NAVIGATIONS", 0)) or None
     
     # Initialize Twitter
     twitter = PersistentTwitter()
     twitter.initialize()
     
     # Run analysis
-    analyze_engagement(twitter, look_back)
+    analyze_engagement(twitter, look_back, tweet_timeout, retries, budget_seconds, budget_navigations)
     
 if __name__ == "__main__":
     run_analysis()
@@ -0,0 +1,289 @@
+import os
+import datetime
+import numpy as np
+from scipy import sparse
+from scipy.sparse.csgraph import connected_components
+
+# Number of set bits in every 16-bit value
+POPCOUNT = np.array([bin(value).count('1') for value in range(1 << 16)], dtype=np.uint8)
+
+# Each engagement type is one bit, so a single uint8 per user/tweet cell keeps all of them
+ENGAGEMENT_FLAGS = {'likes': 1, 'replies': 2, 'retweets': 4, 'quotes': 8}
+
+
+class EngagementMatrix:
+    """Sparse user x tweet matrix recording which tweets each user engaged with, and how"""
+    
+    def __init__(self, users, tweets, matrix):
+        self.users = list(users)
+        self.tweets = list(tweets)
+        self.matrix = matrix.tocsr()
+        self.user_index = {username: i for i, username in enumerate(self.users)}
+    
+    @classmethod
+    def from_engagements(cls, tweet_engagements):
+        """
+        Build the matrix from per-tweet engagements
+        
+        Args:
+            tweet_engagements: Dictionary mapping tweet URL to its engagements dictionary
+        
+        Returns:
+            EngagementMatrix instance
+        """
+        user_index = {}
+        rows, cols, flags = [], [], []
+        
+        for col, engagements in enumerate(tweet_engagements.values()):
+            for engagement_type, flag in ENGAGEMENT_FLAGS.items():
+                for username in set(engagements.get(engagement_type, [])):
+                    rows.append(user_index.setdefault(username, len(user_index)))
+                    cols.append(col)
+                    flags.append(flag)
+        
+        # Duplicate cells only differ by flag bit, so summing them is the same as OR-ing
+        matrix = sparse.coo_matrix(
+            (np.array(flags, dtype=np.uint8), (np.array(rows, dtype=np.int32), np.array(cols, dtype=np.int32))),
+            shape=(len(user_index), len(tweet_engagements))
+        ).tocsr()
+        matrix.sum_duplicates()
+        
+        return cls(user_index.keys(), tweet_engagements.keys(), matrix)
+    
+    def save(self, filename=None):
+        """
+        Save the matrix in compressed form
+        
+        Args:
+            filename: Output path, defaults to a timestamped file in data/
+        
+        Returns:
+            Path of the saved file
+        """
+        if filename is None:
+            os.makedirs('data', exist_ok=True)
+            timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+            filename = f"data/engagement_matrix_{timestamp}.npz"
+        
+        np.savez_compressed(
+            filename,
+            data=self.matrix.data,
+            indices=self.matrix.indices,
+            indptr=self.matrix.indptr,
+            shape=np.array(self.matrix.shape),
+            users=np.array(self.users, dtype=str),
+            tweets=np.array(self.tweets, dtype=str)
+        )
+        print(f"Engagement matrix saved to {filename}")
+        return filename
+    
+    @classmethod
+    def load(cls, filename):
+        """Load a matrix saved with save()"""
+        with np.load(filename) as f:
+            matrix = sparse.csr_matrix((f['data'], f['indices'], f['indptr']), shape=tuple(f['shape']))
+            return cls(f['users'].tolist(), f['tweets'].tolist(), matrix)
+    
+    def binary(self):
+        """Get a 0/1 float matrix of whether each user engaged with each tweet at all"""
+        matrix = self.matrix.astype(np.float32)
+        matrix.data[:] = 1
+        return matrix
+    
+    def weighted(self, weights):
+        """
+        Get a matrix of engagement scores per user and tweet
+        
+        Args:
+            weights: Score of each engagement type
+        
+        Returns:
+            CSR matrix of scores
+        """
+        # Look up the score of every flag combination at once
+        table = np.zeros(16, dtype=np.float32)
+        for combination in range(16):
+            table[combination] = sum(
+                weights[engagement_type] for engagement_type, flag in ENGAGEMENT_FLAGS.items() if combination & flag
+            )
+        
+        matrix = self.matrix.astype(np.float32)
+        matrix.data = table[self.matrix.data]
+        return matrix
+    
+    def similar_users(self, username, top_n=10):
+        """
+        Find the users whose engagement pattern is closest to a given user's
+        
+        Args:
+            username: User to compare against
+            top_n: Number of users to return
+        
+        Returns:
+            List of (username, cosine similarity) tuples, most similar first
+        """
+        if username not in self.user_index:
+            return []
+        
+        binary = self.binary()
+        row = binary[self.user_index[username]]
+        overlap = np.asarray((binary @ row.T).todense()).ravel()
+        norms = np.sqrt(np.asarray(binary.sum(axis=1)).ravel())
+        similarity = overlap / np.maximum(norms * norms[self.user_index[username]], 1)
+        similarity[self.user_index[username]] = 0
+        
+        best = np.argsort(-similarity)[:top_n]
+        return [(self.users[i], float(similarity[i])) for i in best if similarity[i] > 0]
+    
+    def find_clusters(self, min_similarity=0.8, min_tweets=3, min_size=3, chunk_size=1000):
+        """
+        Find groups of accounts that nearly always engage with the same tweets
+        
+        Args:
+            min_similarity: Minimum Jaccard similarity of two users' tweet sets to link them
+            min_tweets: Ignore users who engaged with fewer tweets than this
+            min_size: Minimum number of accounts in a reported cluster
+            chunk_size: Number of tweet sets compared per block, bounds memory use
+        
+        Returns:
+            List of clusters, each a list of usernames, largest first
+        """
+        binary = self.binary()
+        degrees = np.asarray(binary.sum(axis=1)).ravel()
+        active = np.flatnonzero(degrees >= max(min_tweets, 1))
+        if len(active) < min_size:
+            return []
+        
+        # Each account's tweets as a bitmap, one bit per tweet
+        cells = binary[active].tocoo()
+        words = (binary.shape[1] + 63) // 64
+        bitmap = np.zeros((len(active), words), dtype=np.uint64)
+        np.bitwise_or.at(
+            bitmap, (cells.row, cells.col // 64), np.left_shift(np.uint64(1), (cells.col % 64).astype(np.uint64))
+        )
+        
+        # Accounts with identical tweet sets are always linked, so each distinct set is compared once
+        bitmap, account_set = np.unique(bitmap, axis=0, return_inverse=True)
+        account_set = account_set.ravel()
+        set_degrees = POPCOUNT[bitmap.view(np.uint16)].sum(axis=1).astype(np.float64)
+        
+        # Sorted by degree, each set's possible matches form one contiguous range of columns
+        order = np.argsort(set_degrees, kind='stable')
+        bitmap, set_degrees = bitmap[order], set_degrees[order]
+        sorted_position = np.empty(len(order), dtype=np.int64)
+        sorted_position[order] = np.arange(len(order))
+        account_set = sorted_position[account_set]
+        
+        representative = np.empty(len(bitmap), dtype=np.int64)
+        representative[account_set] = np.arange(len(active))
+        set_matrix = binary[active[representative]]
+        
+        # Tolerance so float rounding in the filters below never drops a pair at exactly the threshold
+        tolerance = 1e-9
+        
+        # Tweets ordered rarest first, within each set's row
+        frequency = np.asarray(set_matrix.sum(axis=0)).ravel()
+        rank = np.empty(len(frequency), dtype=np.int64)
+        rank[np.argsort(frequency, kind='stable')] = np.arange(len(frequency))
+        
+        cells = set_matrix.tocoo()
+        order = np.lexsort((rank[cells.col], cells.row))
+        rows, cols = cells.row[order], cells.col[order]
+        position = np.arange(len(rows)) - set_matrix.indptr[rows]
+        
+        def prefix_matrix(overlap_fraction):
+            """Keep each set's rarest |x| - ceil(overlap_fraction * |x|) + 1 tweets"""
+            prefix_length = set_degrees - np.ceil(overlap_fraction * set_degrees - tolerance) + 1
+            in_prefix = position < prefix_length[rows]
+            return sparse.csr_matrix(
+                (np.ones(in_prefix.sum(), dtype=np.float32), (rows[in_prefix], cols[in_prefix])),
+                shape=set_matrix.shape
+            )
+        
+        # Prefix filter: a pair can only reach the threshold if the rarest tweets of the
+        # smaller set, up to the overlap it needs with any set at least as large, share a
+        # tweet with the rarest tweets of the larger set, up to the overlap it needs at all
+        smaller_prefix = prefix_matrix(2 * min_similarity / (1 + min_similarity))
+        larger_prefix = prefix_matrix(min_similarity).T.tocsc()
+        
+        # Bitmaps folded into one 64-bit signature. Every bit set in only one of two
+        # signatures stands for a different tweet only one of the sets contains.
+        signature = np.bitwise_or.reduce(bitmap, axis=1)
+        
+        # Jaccard >= t holds only if the symmetric difference is at most (|x| + |y|)(1 - t) / (1 + t)
+        difference_fraction = (1 - min_similarity) / (1 + min_similarity)
+        
+        # Pairs whose bitmaps are compared at once, fewer when there are many tweets
+        batch_size = max(chunk_size * 1600 // words, chunk_size)
+        edges_from, edges_to = [], []
+        
+        for start in range(0, len(bitmap), chunk_size):
+            # Only sets from this block onwards, up to the largest degree the block can match
+            end = min(start + chunk_size, len(bitmap))
+            stop = np.searchsorted(set_degrees, set_degrees[end - 1] / min_similarity + tolerance, side='right')
+            
+            # Candidate pairs between this block of sets and that range of sets
+            candidates = (smaller_prefix[start:end] @ larger_prefix[:, start:stop]).tocoo()
+            rows_in_block = candidates.row + start
+            cols_in_block = candidates.col + start
+            
+            # Sets are sorted by degree, so the row is the smaller set of every remaining pair.
+            # Length filter: sets whose sizes differ by more than the threshold allows can't match.
+            keep = (rows_in_block < cols_in_block) & (
+                set_degrees[rows_in_block] >= min_similarity * set_degrees[cols_in_block] - tolerance
+            )
+            pair_rows, pair_cols = rows_in_block[keep], cols_in_block[keep]
+            
+            # Signature filter: drop pairs whose signatures already prove too many differences
+            differing_bits = POPCOUNT[(signature[pair_rows] ^ signature[pair_cols]).view(np.uint16)]
+            differing_bits = differing_bits.reshape(len(pair_rows), 4).sum(axis=1)
+            keep = differing_bits <= (set_degrees[pair_rows] + set_degrees[pair_cols]) * difference_fraction + tolerance
+            pair_rows, pair_cols = pair_rows[keep], pair_cols[keep]
+            
+            # Exact Jaccard for the pairs left
+            for batch in range(0, len(pair_rows), batch_size):
+                batch_rows = pair_rows[batch:batch + batch_size]
+                batch_cols = pair_cols[batch:batch + batch_size]
+                
+                shared = POPCOUNT[(bitmap[batch_rows] & bitmap[batch_cols]).view(np.uint16)].sum(axis=1)
+                jaccard = shared / (set_degrees[batch_rows] + set_degrees[batch_cols] - shared)
+                linked = jaccard >= min_similarity
+                edges_from.append(batch_rows[linked])
+                edges_to.append(batch_cols[linked])
+        
+        edges_from = np.concatenate(edges_from) if edges_from else np.empty(0, dtype=np.int64)
+        edges_to = np.concatenate(edges_to) if edges_to else np.empty(0, dtype=np.int64)
+        graph = sparse.coo_matrix(
+            (np.ones(len(edges_from), dtype=np.int8), (edges_from, edges_to)),
+            shape=(len(bitmap), len(bitmap))
+        )
+        _, set_labels = connected_components(graph, directed=False)
+        labels = set_labels[account_set]
+        
+        sizes = np.bincount(labels)
+        clusters = []
+        for label in np.flatnonzero(sizes >= min_size):
+            members = active[labels == label]
+            clusters.append([self.users[i] for i in members])
+        
+        clusters.sort(key=len, reverse=True)
+        return clusters
+    
+    def audience_overlap(self):
+        """
+        Measure how much the audiences of each pair of tweets overlap
+        
+        Returns:
+            Dense tweets x tweets array of Jaccard similarities, indexed like self.tweets
+        """
+        binary = self.binary()
+        shared = np.asarray((binary.T @ binary).todense())
+        audience = np.diag(shared)
+        union = audience[:, None] + audience[None, :] - shared
+        return np.divide(shared, union, out=np.zeros_like(shared), where=union > 0)
+
+def matrix_file_for(engagement_file):
+    """Get the path of the engagement matrix saved alongside an engagers CSV file"""
+    directory, name = os.path.split(engagement_file)
+    timestamp = name[len("engagers_"):-len(".csv")]
+    return os.path.join(directory, f"engagement_matrix_{timestamp}.npz")
@@ -5,6 +5,7 @@ from dotenv import load_dotenv
 from persistent_twitter import PersistentTwitter
 from analyze import run_analysis
 from manage_list import manage_list
+from watch import run_watch
 
 def init_twitter():
     """Initialize Twitter browser instance"""
@@ -24,7 +25,7 @@ def main():
     
     # Parse command line arguments
     parser = argparse.ArgumentParser(description='Twitter Engagement Analyzer')
-    parser.add_argument('command', choices=['init', 'analyze', 'manage_list'], 
+    parser.add_argument('command', choices=['init', 'analyze', 'manage_list', 'watch'], 
                         help='Command to execute')
     
     args = parser.parse_args()
@@ -36,6 +37,8 @@ def main():
         run_analysis()
     elif args.command == 'manage_list':
         manage_list()
+    elif args.command == 'watch':
+        run_watch()
     else:
         print(f"Unknown command: {args.command}")
         sys.exit(1)
@@ -3,6 +3,7 @@ import json
 import csv
 import glob
 from persistent_twitter import PersistentTwitter
+from engagement_matrix import EngagementMatrix, matrix_file_for
 
 def get_latest_engagement_file():
     """Get the most recent engagement data file"""
@@ -53,33 +54,57 @@ def load_engagement_data(file_path):
     engagement_data.sort(key=lambda x: x['total_score'], reverse=True)
     return engagement_data
 
-def manage_list():
-    """Manage Twitter list based on engagement data"""
-    # Initialize Twitter
-    twitter = PersistentTwitter()
-    twitter.initialize()
-    
-    # Get list parameters
-    target_list_link = os.getenv("TARGET_LIST_LINK")
-    list_size = int(os.getenv("LIST_SIZE", 10))
-    
-    # Load whitelist and blacklist
-    whitelist = load_whitelist()
-    blacklist = load_blacklist()
-    
-    # Get current list members
-    print(f"Fetching current members of list: {target_list_link}")
-    current_members = twitter.get_list_members(target_list_link)
-    print(f"Current list has {len(current_members)} members")
-    
-    # Find the latest engagement data file
-    engagement_file = get_latest_engagement_file()
-    if not engagement_file:
-        print("No engagement data found. Please run 'analyze' first.")
-        return
+def load_clusters(engagement_file, min_similarity=0.8):
+    """
+    Find clusters of accounts that engage together in the matrix saved with an engagers file
     
-    print(f"Using engagement data from: {engagement_file}")
-    engagement_data = load_engagement_data(engagement_file)
+    Args:
+        engagement_file: Engagers CSV file the recommendations are based on
+        min_similarity: Minimum Jaccard similarity for two accounts to be clustered
+        
+    Returns:
+        Dictionary mapping username to cluster number, empty if there is no matching matrix
+    """
+    matrix_file = matrix_file_for(engagement_file)
+    if not os.path.exists(matrix_file):
+        print(f"No engagement matrix found for {engagement_file}, list will not be diversified")
+        return {}
+    
+    clusters = EngagementMatrix.load(matrix_file).find_clusters(min_similarity=min_similarity)
+    if clusters:
+        print(f"Found {len(clusters)} clusters of accounts that engage together, adding at most one per cluster")
+    
+    return {username: i for i, cluster in enumerate(clusters) for username in cluster}
+
+def recommend_list_changes(current_members, engagement_data, whitelist, blacklist, list_size, clusters=None):
+    """
+    Work out which list members to keep, remove and add
+    
+    Args:
+        current_members: Usernames currently in the list
+        engagement_data: Engagement rows sorted by total score in descending order
+        whitelist: Usernames that are always kept
+        blacklist: Usernames that are never added
+        list_size: Target size of the list
+        clusters: Optional map of username to co-engagement cluster, candidates from
+            a cluster that is already represented in the list are not added
+        
+    Returns:
+        Dictionary with 'keep', 'remove' and 'result' username lists, 'add' user rows
+        and a 'scores' map of username to total score
+    """
+    scores = {user['username']: user['total_score'] for user in engagement_data}
+    clusters = clusters or {}
+    taken_clusters = {clusters[username] for username in current_members if username in clusters}
+    
+    def is_diverse(username):
+        """Check whether adding a user keeps at most one account per cluster"""
+        if username not in clusters:
+            return True
+        if clusters[username] in taken_clusters:
+            return False
+        taken_clusters.add(clusters[username])
+        return True
     
     # Calculate who to keep and who to add
     keep_list = []
@@ -103,14 +128,7 @@ def manage_list():
     # If we need to remove users to make room
     if len(remaining_members) > remaining_slots:
         # Create a map of current members to their engagement scores
-        member_scores = {}
-        for member in remaining_members:
-            score = 0
-            for user in engagement_data:
-                if user['username'] == member:
-                    score = user['total_score']
-                    break
-            member_scores[member] = score
+        member_scores = {member: scores.get(member, 0) for member in remaining_members}
         
         # Sort members by score
         sorted_members = sorted(member_scores.items(), key=lambda x: x[1], reverse=True)
@@ -129,11 +147,69 @@ def manage_list():
         # Add new high-scoring users if there are slots available
         for user in candidates:
             if remaining_slots > 0:
+                if not is_diverse(user['username']):
+                    continue
                 keep_list.append(user['username'])
                 remaining_slots -= 1
             else:
                 break
     
+    # Find users to add (who aren't already in the keep list)
+    users_to_add = []
+    remaining_slots = list_size - len(keep_list)
+    
+    for user in candidates:
+        if user['username'] not in keep_list and remaining_slots > 0 and is_diverse(user['username']):
+            users_to_add.append(user)
+            remaining_slots -= 1
+        if remaining_slots <= 0:
+            break
+    
+    return {
+        'keep': keep_list,
+        'remove': remove_list,
+        'add': users_to_add,
+        'result': keep_list + [user['username'] for user in users_to_add],
+        'scores': scores
+    }
+
+def manage_list():
+    """Manage Twitter list based on engagement data"""
+    # Initialize Twitter
+    twitter = PersistentTwitter()
+    twitter.initialize()
+    
+    # Get list parameters
+    target_list_link = os.getenv("TARGET_LIST_LINK")
+    list_size = int(os.getenv("LIST_SIZE", 10))
+    
+    # Load whitelist and blacklist
+    whitelist = load_whitelist()
+    blacklist = load_blacklist()
+    
+    # Get current list members
+    print(f"Fetching current members of list: {target_list_link}")
+    current_members = twitter.get_list_members(target_list_link)
+    print(f"Current list has {len(current_members)} members")
+    
+    # Find the latest engagement data file
+    engagement_file = get_latest_engagement_file()
+    if not engagement_file:
+        print("No engagement data found. Please run 'analyze' first.")
+        return
+    
+    print(f"Using engagement data from: {engagement_file}")
+    engagement_data = load_engagement_data(engagement_file)
+    
+    clusters = load_clusters(engagement_file, float(os.getenv("CLUSTER_SIMILARITY", 0.8)))
+    
+    recommendations = recommend_list_changes(
+        current_members, engagement_data, whitelist, blacklist, list_size, clusters
+    )
+    keep_list = recommendations['keep']
+    remove_list = recommendations['remove']
+    users_to_add = recommendations['add']
+    
     # Generate report
     print("\n--- LIST MANAGEMENT REPORT ---")
     print(f"Target list size: {list_size}")
@@ -145,27 +221,10 @@ def manage_list():
     if remove_list:
         print("\nUsers to remove:")
         for username in remove_list:
-            # Find the score if available
-            score = 0
-            for user in engagement_data:
-                if user['username'] == username:
-                    score = user['total_score']
-                    break
-            print(f"  - {username} (Score: {score})")
+            print(f"  - {username} (Score: {recommendations['scores'].get(username, 0)})")
     else:
         print("\nNo users need to be removed.")
     
-    # Find users to add (who aren't already in the keep list)
-    users_to_add = []
-    remaining_slots = list_size - len(keep_list)
-    
-    for user in candidates:
-        if user['username'] not in keep_list and remaining_slots > 0:
-            users_to_add.append(user)
-            remaining_slots -= 1
-        if remaining_slots <= 0:
-            break
-    
     if users_to_add:
         print("\nUsers to add:")
         for user in users_to_add:
@@ -174,7 +233,7 @@ def manage_list():
         print("\nNo users need to be added.")
     
     print("\nResulting list would contain:")
-    for username in keep_list + [user['username'] for user in users_to_add]:
+    for username in recommendations['result']:
         print(f"  - {username}")
     
     print("\nNote: Please manually update your Twitter list based on these recommendations.")
@@ -0,0 +1,215 @@
+import os
+import csv
+import time
+import datetime
+import psutil
+
+
+class MemoryGovernor:
+    """Track Chrome's memory use and recycle the scraping tab before it slows the run down"""
+    
+    def __init__(self, twitter, max_memory_mb=2048, max_heap_mb=512, max_pages_per_tab=200, sample_interval=10,
+                 cooldown_pages=100, renderer_exit_timeout=3):
+        self.twitter = twitter
+        self.max_memory_mb = max_memory_mb
+        self.max_heap_mb = max_heap_mb
+        self.max_pages_per_tab = max_pages_per_tab
+        self.sample_interval = sample_interval
+        self.cooldown_pages = cooldown_pages
+        self.renderer_exit_timeout = renderer_exit_timeout
+        
+        self.pages = 0
+        self.pages_in_tab = 0
+        self.recycles = 0
+        self.restarts = 0
+        self.last_sample = None
+        
+        # No memory-triggered action is taken again before this page count
+        self.cooldown_until = 0
+        
+        os.makedirs('data', exist_ok=True)
+        timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+        self.log_file = f"data/memory_{timestamp}.csv"
+    
+    def get_renderer_processes(self):
+        """
+        Find Chrome's page renderer processes
+        
+        The browser, GPU, utility and extension processes are left out, since replacing
+        the scraping tab can't release their memory.
+        
+        Returns:
+            List of psutil processes, or None if the Chrome process is unknown
+        """
+        if self.twitter.pid is None:
+            return None
+        
+        try:
+            processes = psutil.Process(self.twitter.pid).children(recursive=True)
+        except psutil.NoSuchProcess:
+            return None
+        
+        renderers = []
+        for process in processes:
+            try:
+                cmdline = process.cmdline()
+                if "--type=renderer" in cmdline and "--extension-process" not in cmdline:
+                    renderers.append(process)
+            except (psutil.NoSuchProcess, psutil.AccessDenied):
+                continue
+        
+        return renderers
+    
+    def get_renderer_memory_mb(self):
+        """
+        Sum the resident memory of Chrome's page renderer processes
+        
+        Returns:
+            Memory in MB, or None if the Chrome process is unknown
+        """
+        processes = self.get_renderer_processes()
+        if processes is None:
+            return None
+        
+        total = 0
+        for process in processes:
+            try:
+                total += process.memory_info().rss
+            except (psutil.NoSuchProcess, psutil.AccessDenied):
+                continue
+        
+        return total / (1024 * 1024)
+    
+    def get_heap_mb(self):
+        """
+        Read the JS heap usage of the current tab over CDP
+        
+        Returns:
+            Used heap in MB, or None if it could not be read
+        """
+        try:
+            usage = self.twitter.browser.execute_cdp_cmd("Runtime.getHeapUsage", {})
+            return usage["usedSize"] / (1024 * 1024)
+        except Exception:
+            return None
+    
+    def sample(self, action=""):
+        """
+        Take a memory sample, print the trend and append it to the memory log
+        
+        Args:
+            action: What the governor did at this sample, if anything
+        
+        Returns:
+            Dictionary with 'memory_mb' and 'heap_mb'
+        """
+        current = {
+            'memory_mb': self.get_renderer_memory_mb(),
+            'heap_mb': self.get_heap_mb(),
+        }
+        
+        trend = ""
+        if self.last_sample and current['memory_mb'] is not None and self.last_sample['memory_mb'] is not None:
+            trend = f" ({current['memory_mb'] - self.last_sample['memory_mb']:+.0f} MB)"
+        
+        memory = "n/a" if current['memory_mb'] is None else f"{current['memory_mb']:.0f} MB"
+        heap = "n/a" if current['heap_mb'] is None else f"{current['heap_mb']:.0f} MB"
+        print(f"Memory after {self.pages} pages: renderers {memory}{trend}, JS heap {heap}")
+        
+        new_file = not os.path.exists(self.log_file)
+        with open(self.log_file, 'a', newline='') as csvfile:
+            writer = csv.DictWriter(csvfile, fieldnames=['time', 'pages', 'memory_mb', 'heap_mb', 'action'])
+            if new_file:
+                writer.writeheader()
+            writer.writerow({
+                'time': time.time(),
+                'pages': self.pages,
+                'memory_mb': current['memory_mb'],
+                'heap_mb': current['heap_mb'],
+                'action': action
+            })
+        
+        self.last_sample = current
+        return current
+    
+    def before_navigation(self):
+        """Count a page load and recycle the tab first if a limit has been crossed"""
+        self.pages += 1
+        self.pages_in_tab += 1
+        
+        if self.pages_in_tab > self.max_pages_per_tab:
+            self.recycle_tab(f"{self.max_pages_per_tab} pages loaded in this tab")
+            return
+        
+        if self.pages % self.sample_interval:
+            return
+        
+        current = self.sample()
+        if current['heap_mb'] is not None and current['heap_mb'] > self.max_heap_mb:
+            self.recycle_tab(f"JS heap above {self.max_heap_mb} MB")
+        elif current['memory_mb'] is not None and current['memory_mb'] > self.max_memory_mb:
+            if self.pages >= self.cooldown_until:
+                self.relieve_memory()
+    
+    def relieve_memory(self):
+        """
+        Bring renderer memory back under the limit, escalating from a tab recycle to a browser restart
+        
+        Whatever the outcome, memory-triggered actions then pause for cooldown_pages pages
+        so an ineffective recycle or restart is not repeated on every sample.
+        """
+        self.cooldown_until = self.pages + self.cooldown_pages
+        
+        if self.recycle_tab(f"renderer memory above {self.max_memory_mb} MB"):
+            current = self.last_sample
+            if current['memory_mb'] is None or current['memory_mb'] <= self.max_memory_mb:
+                return
+        
+        print("Renderer memory still above the limit, restarting Chrome")
+        if self.twitter.restart_browser():
+            self.restarts += 1
+            self.pages_in_tab = 1
+            self.sample(action="restarted browser")
+        else:
+            self.sample(action="browser restart failed")
+    
+    def recycle_tab(self, reason):
+        """
+        Replace the scraping tab with a fresh one so its renderer memory is released
+        
+        The profile and its cookies are shared by every tab, so the session survives.
+        
+        Args:
+            reason: Why the tab is being recycled
+            
+        Returns:
+            True if the tab was replaced
+        """
+        print(f"Recycling browser tab: {reason}")
+        browser = self.twitter.browser
+        
+        # The renderers serving the old tab, before the new tab starts one of its own
+        old_renderers = self.get_renderer_processes() or []
+        
+        try:
+            old_handle = browser.current_window_handle
+            browser.switch_to.new_window('tab')
+            new_handle = browser.current_window_handle
+            
+            browser.switch_to.window(old_handle)
+            browser.close()
+            browser.switch_to.window(new_handle)
+        except Exception as e:
+            print(f"Error recycling tab: {e}")
+            return False
+        
+        # Chrome shuts the closed tab's renderer down asynchronously, sampling right away
+        # would still count its memory and make the recycle look ineffective
+        _, alive = psutil.wait_procs(old_renderers, timeout=self.renderer_exit_timeout)
+        if alive:
+            print(f"{len(alive)} renderer processes still running after closing the old tab")
+        
+        self.recycles += 1
+        self.pages_in_tab = 1
+        self.sample(action=f"recycled: {reason}")
+        return True
@@ -1,8 +1,10 @@
 import os
+import re
 import time
 import json
 import subprocess
 import signal
+import urllib.request
 import psutil
 from selenium import webdriver
 from selenium.webdriver.common.by import By
@@ -11,6 +13,23 @@ from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import TimeoutException, NoSuchElementException
+from recorder import RecordingBrowser, ReplayBrowser
+from memory_governor import MemoryGovernor
+
+
+DEFAULT_PAGE_LOAD_TIMEOUT = 300
+DEFAULT_SCRIPT_TIMEOUT = 30
+
+# Engagement buttons are labelled without a number when their count is zero
+ZERO_COUNT_LABEL = re.compile(r"^\s*(reply|repost|reposted|like|liked|unlike|undo repost)\s*$", re.IGNORECASE)
+
+
+class TweetTimeout(Exception):
+    """Raised when scraping a single tweet runs past its watchdog deadline"""
+
+
+class BudgetExhausted(TweetTimeout):
+    """Raised instead of loading a page once the navigation limit has been reached"""
 
 
 class PersistentTwitter:
@@ -21,6 +40,18 @@ class PersistentTwitter:
         self.username = os.getenv("TWITTER_USERNAME")
         self.password = os.getenv("TWITTER_PASSWORD")
         self.port = 9222
+        self.pid = None
+        self.user_data_dir = os.path.abspath("chrome_user_data")
+        self.deadline = None
+        self.governor = None
+        self.navigations = 0
+        
+        # Optional total of page loads after which _load refuses to navigate
+        self.navigation_limit = None
+        
+        # Optional directories for recording a live session or replaying a recorded one
+        self.record_dir = os.getenv("RECORD_SESSION")
+        self.replay_dir = os.getenv("REPLAY_SESSION")
         
     def is_browser_running(self):
         """Check if a browser instance is already running by checking the PID file"""
@@ -37,9 +68,15 @@ class PersistentTwitter:
             # Check if process with this PID exists
             try:
                 process = psutil.Process(pid)
-                return process.is_running() and "chrome" in process.name().lower()
+                if not (process.is_running() and "chrome" in process.name().lower()):
+                    return False
             except psutil.NoSuchProcess:
                 return False
+            
+            self.pid = pid
+            
+            # Make sure the DevTools endpoint is actually answering
+            return self._wait_for_devtools(timeout=1)
         except (ValueError, FileNotFoundError):
             return False
     
@@ -48,32 +85,43 @@ class PersistentTwitter:
         try:
             # Attempt to connect to the existing browser using Chrome DevTools Protocol
             print(f"Attempting to connect to existing Chrome instance on port {self.port}")
-            options = Options()
-            options.add_experimental_option("debuggerAddress", f"127.0.0.1:{self.port}")
-            self.browser = webdriver.Chrome(options=options)
+            self.browser = webdriver.Chrome(options=self._browser_options())
             print("Successfully connected to existing browser instance")
             return True
         except Exception as e:
             print(f"Failed to connect to existing browser: {e}")
             return False
     
+    def _browser_options(self):
+        """Build the options used to attach WebDriver to the Chrome instance"""
+        options = Options()
+        options.add_experimental_option("debuggerAddress", f"127.0.0.1:{self.port}")
+        
+        if self.record_dir:
+            # Performance logs carry the network events the recorder saves payloads from
+            options.set_capability("goog:loggingPrefs", {"performance": "ALL"})
+            
+        return options
+    
     def start_new_browser(self):
         """Start a new Chrome browser instance and save its PID"""
         try:
-            # Find an available port
-            self.port = self._find_available_port(start_port=9222)
-            
             # Start Chrome with remote debugging enabled
-            user_data_dir = os.path.abspath("chrome_user_data")
-            os.makedirs(user_data_dir, exist_ok=True)
+            os.makedirs(self.user_data_dir, exist_ok=True)
+            
+            # Chrome reports the port it picks in this file, so a stale copy must not be read
+            try:
+                os.remove(os.path.join(self.user_data_dir, "DevToolsActivePort"))
+            except FileNotFoundError:
+                pass
             
             chrome_executable = self._find_chrome_executable()
             
-            # Start Chrome as a detached process
+            # Start Chrome as a detached process, letting it pick a free debugging port itself
             chrome_cmd = [
                 chrome_executable,
-                f"--remote-debugging-port={self.port}",
-                f"--user-data-dir={user_data_dir}",
+                "--remote-debugging-port=0",
+                f"--user-data-dir={self.user_data_dir}",
                 "--no-first-run",
                 "--no-default-browser-check",
                 "--start-maximized"
@@ -86,6 +134,14 @@ class PersistentTwitter:
             else:  # Unix/Linux/MacOS
                 process = subprocess.Popen(chrome_cmd, preexec_fn=os.setpgrp, start_new_session=True)
             
+            self.pid = process.pid
+            self.port = None
+            
+            # Wait until the DevTools endpoint is ready instead of sleeping a fixed amount
+            if not self._wait_for_devtools(timeout=15, read_port=True):
+                print("Chrome did not open its DevTools endpoint in time")
+                return False
+            
             # Store PID and port
             with open(self.pid_file, 'w') as f:
                 f.write(str(process.pid))
@@ -94,13 +150,8 @@ class PersistentTwitter:
                 
             print(f"Started new Chrome instance with PID: {process.pid}, port: {self.port}")
             
-            # Give Chrome some time to start up
-            time.sleep(3)
-            
             # Connect to the browser
-            options = Options()
-            options.add_experimental_option("debuggerAddress", f"127.0.0.1:{self.port}")
-            self.browser = webdriver.Chrome(options=options)
+            self.browser = webdriver.Chrome(options=self._browser_options())
             
             print("Connected to new Chrome instance")
             return True
@@ -109,6 +160,49 @@ class PersistentTwitter:
             print(f"Error starting new browser: {e}")
             return False
     
+    def restart_browser(self):
+        """
+        Restart Chrome on the same profile directory
+        
+        The login session lives in the profile's cookies, so it survives the restart.
+        
+        Returns:
+            True if a new browser is connected
+        """
+        recorder = self.browser if isinstance(self.browser, RecordingBrowser) else None
+        driver = recorder.driver if recorder else self.browser
+        
+        try:
+            driver.quit()
+        except Exception:
+            pass
+        
+        if self.pid is not None:
+            try:
+                root = psutil.Process(self.pid)
+                processes = root.children(recursive=True) + [root]
+                for process in processes:
+                    process.terminate()
+                _, alive = psutil.wait_procs(processes, timeout=5)
+                for process in alive:
+                    process.kill()
+            except psutil.NoSuchProcess:
+                pass
+        
+        if not self.start_new_browser():
+            return False
+        
+        if recorder:
+            recorder.driver = self.browser
+            self.browser = recorder
+        
+        # Keep the current tweet's watchdog in force on the new driver
+        if self.deadline is not None:
+            self.browser.set_page_load_timeout(max(self.deadline - time.time(), 1))
+            self.browser.set_script_timeout(max(self.deadline - time.time(), 1))
+        
+        return True
+    
     def _find_chrome_executable(self):
         """Find the Chrome executable path based on OS"""
         if os.name == 'nt':  # Windows
@@ -143,39 +237,173 @@ class PersistentTwitter:
         else:
             return "google-chrome"  # Default
     
-    def _find_available_port(self, start_port=9222, max_port=9322):
-        """Find an available port for Chrome remote debugging"""
-        import socket
-        
-        for port in range(start_port, max_port):
-            with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
-                if s.connect_ex(('localhost', port)) != 0:
-                    return port
-                    
-        # Fallback to default if no port is available
-        return start_port
+    def _read_devtools_port(self):
+        """
+        Read the remote debugging port Chrome wrote to its profile directory
+        
+        Returns:
+            Port number, or None if Chrome has not written it yet
+        """
+        try:
+            with open(os.path.join(self.user_data_dir, "DevToolsActivePort"), 'r') as f:
+                return int(f.readline().strip())
+        except (OSError, ValueError):
+            return None
+    
+    def _wait_for_devtools(self, timeout=15, interval=0.1, read_port=False):
+        """
+        Poll the DevTools /json/version endpoint until the browser answers
+        
+        Args:
+            timeout: Maximum number of seconds to wait
+            interval: Seconds between polls
+            read_port: Take the port from Chrome's DevToolsActivePort file on every poll
+            
+        Returns:
+            True if the endpoint answered before the timeout
+        """
+        # The endpoint is local, so never send it through HTTP_PROXY
+        opener = urllib.request.build_opener(urllib.request.ProxyHandler({}))
+        deadline = time.time() + timeout
+        
+        while True:
+            if read_port:
+                self.port = self._read_devtools_port()
+                
+            if self.port is not None:
+                try:
+                    with opener.open(f"http://127.0.0.1:{self.port}/json/version", timeout=interval * 5) as response:
+                        json.load(response)
+                        return True
+                except (OSError, ValueError):
+                    pass
+            
+            if time.time() >= deadline:
+                return False
+            time.sleep(interval)
     
     def initialize(self):
         """Initialize the browser - connect to existing one or start a new one"""
+        if self.replay_dir:
+            # Replays never touch the live site, so there is nothing to log into
+            print(f"Replaying recorded session from {self.replay_dir}")
+            self.browser = ReplayBrowser(self.replay_dir)
+            return True
+            
         if self.is_browser_running() and self.connect_to_existing_browser():
             # Check if we're already logged in
             if not self.is_logged_in():
                 self.login()
-        else:
-            self.start_new_browser()
-            self.login()
+        elif self.start_new_browser():
+            # The profile directory keeps cookies, so a fresh process may already be logged in
+            if not self.is_logged_in():
+                self.login()
+        
+        if self.browser is not None:
+            self.governor = MemoryGovernor(
+                self,
+                max_memory_mb=int(os.getenv("CHROME_MAX_MEMORY_MB", 2048)),
+                max_heap_mb=int(os.getenv("CHROME_MAX_HEAP_MB", 512)),
+                max_pages_per_tab=int(os.getenv("CHROME_MAX_PAGES_PER_TAB", 200)),
+                sample_interval=int(os.getenv("MEMORY_SAMPLE_INTERVAL", 10)),
+                cooldown_pages=int(os.getenv("MEMORY_COOLDOWN_PAGES", 100))
+            )
+        
+        if self.record_dir and self.browser is not None:
+            print(f"Recording session to {self.record_dir}")
+            self.browser = RecordingBrowser(self.browser, self.record_dir)
         
         return self.browser is not None
         
+    def _pause(self, seconds):
+        """Wait for the page to settle, skipped when replaying a recorded session"""
+        if self.deadline is not None:
+            seconds = self._remaining(seconds)
+        if not self.replay_dir:
+            time.sleep(seconds)
+    
+    def _start_deadline(self, timeout):
+        """
+        Start the watchdog deadline for the current tweet
+        
+        Page loads and scripts are cut off by the browser, waits and pauses are capped
+        to the time left. Element lookups are not, so a hung renderer can still hold
+        a lookup for Selenium's command timeout before the deadline is noticed.
+        """
+        if timeout is None:
+            return
+        self.deadline = time.time() + timeout
+        self.browser.set_page_load_timeout(timeout)
+        self.browser.set_script_timeout(timeout)
+    
+    def _clear_deadline(self):
+        """Stop the watchdog deadline and restore the default page load and script timeouts"""
+        if self.deadline is None:
+            return
+        self.deadline = None
+        self.browser.set_page_load_timeout(DEFAULT_PAGE_LOAD_TIMEOUT)
+        self.browser.set_script_timeout(DEFAULT_SCRIPT_TIMEOUT)
+    
+    def _remaining(self, timeout):
+        """
+        Cap a timeout to the time left before the deadline
+        
+        Args:
+            timeout: Seconds the caller would like to wait
+            
+        Returns:
+            Seconds the caller may wait
+        """
+        if self.deadline is None:
+            return timeout
+        
+        remaining = self.deadline - time.time()
+        if remaining <= 0:
+            raise TweetTimeout("Watchdog deadline exceeded")
+        return min(timeout, remaining)
+    
+    def _wait(self, condition, timeout=10):
+        """Wait for a condition, but never past the watchdog deadline"""
+        try:
+            return WebDriverWait(self.browser, self._remaining(timeout)).until(condition)
+        except TimeoutException:
+            self._remaining(0)  # Raises TweetTimeout if the deadline is what cut us off
+            raise
+    
+    def _load(self, url):
+        """Navigate to a page, turning a page load cut off by the deadline into TweetTimeout"""
+        if self.navigation_limit is not None and self.navigations >= self.navigation_limit:
+            raise BudgetExhausted(f"Navigation limit of {self.navigation_limit} page loads reached: {url}")
+            
+        self.navigations += 1
+        if self.governor is not None:
+            self.governor.before_navigation()
+            
+        try:
+            self.browser.get(url)
+        except TimeoutException:
+            if self.deadline is not None:
+                raise TweetTimeout(f"Page load exceeded watchdog deadline: {url}")
+            raise
+    
     def is_logged_in(self):
-        """Check if we're logged into Twitter"""
+        """Check if we're logged into Twitter by looking for a valid auth cookie"""
         try:
-            self.browser.get("https://twitter.com/home")
-            time.sleep(3)  # Give page time to load
+            # Read every cookie in the profile over CDP so no page has to be loaded
+            cookies = self.browser.execute_cdp_cmd("Network.getAllCookies", {}).get("cookies", [])
+            now = time.time()
             
-            # If we see the login button, we're not logged in
-            login_buttons = self.browser.find_elements(By.XPATH, "//a[@href='/login']")
-            return len(login_buttons) == 0
+            for cookie in cookies:
+                domain = cookie.get("domain", "").lstrip(".")
+                if cookie.get("name") != "auth_token" or domain not in ("twitter.com", "x.com"):
+                    continue
+                
+                # Session cookies report an expiry of -1
+                expires = cookie.get("expires", -1)
+                if expires == -1 or expires > now:
+                    return True
+                    
+            return False
         except Exception as e:
             print(f"Error checking login status: {e}")
             return False
@@ -226,11 +454,12 @@ class PersistentTwitter:
         """Navigate to user's profile and collect tweet data"""
         try:
             # Navigate to user's profile
-            self.browser.get(f"https://twitter.com/{self.username}")
-            time.sleep(3)
+            self._load(f"https://twitter.com/{self.username}")
+            self._pause(3)
             
             tweets = []
             tweet_elements = []
+            seen_urls = set()
             last_height = self.browser.execute_script("return document.body.scrollHeight")
             
             # Keep scrolling until we have enough tweets or can't find more
@@ -258,9 +487,16 @@ class PersistentTwitter:
                         timestamp = elem.find_element(By.XPATH, ".//time")
                         tweet_url = timestamp.find_element(By.XPATH, "./..").get_attribute("href")
                         
+                        # The timeline is virtualized, so the same tweet can come back as a new element
+                        if tweet_url in seen_urls:
+                            continue
+                        seen_urls.add(tweet_url)
+                        
                         tweets.append({
                             "element": elem,
-                            "url": tweet_url
+                            "url": tweet_url,
+                            "posted_at": timestamp.get_attribute("datetime"),
+                            "counts": self._get_tweet_counts(elem)
                         })
                         
                         if len(tweets) >= count:
@@ -270,7 +506,7 @@ class PersistentTwitter:
                 
                 # Scroll down
                 self.browser.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-                time.sleep(2)
+                self._pause(2)
                 
                 # Check if we've reached the end of the page
                 new_height = self.browser.execute_script("return document.body.scrollHeight")
@@ -284,133 +520,242 @@ class PersistentTwitter:
             print(f"Error getting profile tweets: {e}")
             return []
     
-    def get_tweet_engagements(self, tweet_url):
-        """Get engagement data for a specific tweet"""
+    def _get_tweet_counts(self, elem):
+        """
+        Read the visible engagement counters of a tweet element
+        
+        Args:
+            elem: Tweet article element
+            
+        Returns:
+            Dictionary with 'replies', 'retweets' and 'likes' counts, where a
+            counter that could not be read is None rather than 0
+        """
+        counts = {}
+        buttons = {
+            "replies": ["reply"],
+            "retweets": ["retweet", "unretweet"],
+            "likes": ["like", "unlike"],
+        }
+        
+        for key, test_ids in buttons.items():
+            counts[key] = None
+            for test_id in test_ids:
+                found = elem.find_elements(By.XPATH, f".//*[@data-testid='{test_id}']")
+                if not found:
+                    continue
+                    
+                # The aria-label holds the exact number, e.g. "12 Likes. Like"
+                label = found[0].get_attribute("aria-label") or ""
+                match = re.match(r"\s*([\d,]+)", label)
+                if match:
+                    counts[key] = int(match.group(1).replace(",", ""))
+                elif ZERO_COUNT_LABEL.match(label):
+                    # Buttons drop the number entirely when nothing has been counted yet
+                    counts[key] = 0
+                break
+                
+        return counts
+    
+    def get_tweet_engagements(self, tweet_url, counts=None, timeout=None):
+        """
+        Get engagement data for a specific tweet
+        
+        Args:
+            tweet_url: URL of the tweet
+            counts: Visible counters from get_profile_tweets, used to skip empty tabs
+            timeout: Seconds the whole tweet may take before TweetTimeout is raised
+            
+        Returns:
+            Dictionary of usernames per engagement type, plus an 'errors' list
+            describing every part of the tweet that could not be collected
+        """
+        engagements = {"likes": [], "retweets": [], "quotes": [], "replies": [], "errors": []}
+        
+        # Repost counters include quotes, so both tabs can be skipped when it is zero
+        wanted_tabs = {
+            "likes": "Liked by",
+            "retweets": "Reposted by",
+            "quotes": "Quoted",
+        }
+        # Only a counter that was read as zero proves a tab empty, unknown counters are collected
+        counts = counts or {}
+        if counts.get("likes") == 0:
+            del wanted_tabs["likes"]
+        if counts.get("retweets") == 0:
+            del wanted_tabs["retweets"]
+            del wanted_tabs["quotes"]
+        
+        want_replies = counts.get("replies") != 0
+        if not wanted_tabs and not want_replies:
+            # Nothing to collect, so don't even open the tweet
+            return engagements
+        
+        self._start_deadline(timeout)
         try:
             # Navigate to the tweet
-            self.browser.get(tweet_url)
-            time.sleep(3)
-            
-            # Click on Post Engagements
-            engagements_button = WebDriverWait(self.browser, 10).until(
-                EC.element_to_be_clickable((By.XPATH, "//div[@aria-label='More']"))
-            )
-            engagements_button.click()
-            time.sleep(1)
-            
-            post_engagements = WebDriverWait(self.browser, 10).until(
-                EC.element_to_be_clickable((By.XPATH, "//span[contains(text(), 'Post engagements')]"))
-            )
-            post_engagements.click()
-            time.sleep(2)
-            
-            # Collect engagement data
-            engagements = {
-                "likes": self.get_user_list("Liked by"),
-                "retweets": self.get_user_list("Reposted by"),
-                "quotes": self.get_user_list("Quoted"),
-            }
+            self._load(tweet_url)
+            self._pause(3)
             
-            # Go back to the tweet to collect replies
-            self.browser.get(tweet_url)
-            time.sleep(2)
-            engagements["replies"] = self.get_replies()
+            if wanted_tabs:
+                try:
+                    self._open_post_engagements()
+                    available = self._get_engagement_tabs()
+                except TweetTimeout:
+                    raise
+                except Exception as e:
+                    engagements["errors"].append(f"post engagements: {e}")
+                    wanted_tabs = {}
+                    
+                shown = {
+                    key: available is None or any(tab_name in text for text in available)
+                    for key, tab_name in wanted_tabs.items()
+                }
+                
+                # Missing tabs are only suspicious when the counters say there is engagement
+                if "likes" in shown and not shown["likes"] and counts.get("likes"):
+                    engagements["errors"].append(f"likes: tab not shown despite {counts['likes']} likes")
+                if "retweets" in shown and not (shown["retweets"] or shown["quotes"]) and counts.get("retweets"):
+                    engagements["errors"].append(f"retweets: tabs not shown despite {counts['retweets']} reposts")
+                    
+                for key, tab_name in wanted_tabs.items():
+                    # A single probe of the tab bar tells us which tabs exist at all
+                    if not shown[key]:
+                        continue
+                    try:
+                        engagements[key] = self.get_user_list(tab_name)
+                    except TweetTimeout:
+                        raise
+                    except Exception as e:
+                        engagements["errors"].append(f"{key}: {e}")
             
+            if want_replies:
+                try:
+                    # Go back to the tweet to collect replies
+                    self._load(tweet_url)
+                    self._pause(2)
+                    engagements["replies"] = self.get_replies()
+                except TweetTimeout:
+                    raise
+                except Exception as e:
+                    engagements["errors"].append(f"replies: {e}")
+            
+            for error in engagements["errors"]:
+                print(f"Error getting engagements for tweet {tweet_url}: {error}")
+                
             return engagements
-            
-        except Exception as e:
-            print(f"Error getting engagements for tweet {tweet_url}: {e}")
-            return {"likes": [], "retweets": [], "quotes": [], "replies": []}
+        finally:
+            self._clear_deadline()
+    
+    def _open_post_engagements(self):
+        """Open the Post engagements view from the tweet's More menu"""
+        engagements_button = self._wait(
+            EC.element_to_be_clickable((By.XPATH, "//div[@aria-label='More']"))
+        )
+        engagements_button.click()
+        self._pause(1)
+        
+        post_engagements = self._wait(
+            EC.element_to_be_clickable((By.XPATH, "//span[contains(text(), 'Post engagements')]"))
+        )
+        post_engagements.click()
+        self._pause(2)
+    
+    def _get_engagement_tabs(self):
+        """
+        Read the labels of the tabs shown in the Post engagements view
+        
+        Returns:
+            List of tab labels, or None if the tab bar could not be found
+        """
+        tabs = self.browser.find_elements(By.XPATH, "//*[@role='tab']")
+        if not tabs:
+            return None
+        return [tab.text for tab in tabs]
     
     def get_user_list(self, tab_name):
         """Get list of users from a specific engagement tab"""
         users = []
-        try:
-            # Find and click the tab
-            tab = WebDriverWait(self.browser, 10).until(
-                EC.element_to_be_clickable((By.XPATH, f"//span[contains(text(), '{tab_name}')]"))
-            )
-            tab.click()
-            time.sleep(2)
+        
+        # Find and click the tab
+        tab = self._wait(
+            EC.element_to_be_clickable((By.XPATH, f"//span[contains(text(), '{tab_name}')]"))
+        )
+        tab.click()
+        self._pause(2)
+        
+        last_height = 0
+        scrolls = 0
+        max_scrolls = 10  # Limit scrolling to avoid infinite loops
+        
+        while scrolls < max_scrolls:
+            # Get all user elements
+            user_elements = self.browser.find_elements(By.XPATH, "//div[@data-testid='cellInnerDiv']//a[contains(@href, '/')]")
             
-            last_height = 0
-            scrolls = 0
-            max_scrolls = 10  # Limit scrolling to avoid infinite loops
+            for elem in user_elements:
+                try:
+                    # Extract username from href
+                    href = elem.get_attribute("href")
+                    if href and "/status/" not in href:
+                        username = href.split('/')[-1]
+                        if username and username not in users:
+                            users.append(username)
+                except:
+                    continue
             
-            while scrolls < max_scrolls:
-                # Get all user elements
-                user_elements = self.browser.find_elements(By.XPATH, "//div[@data-testid='cellInnerDiv']//a[contains(@href, '/')]")
-                
-                for elem in user_elements:
-                    try:
-                        # Extract username from href
-                        href = elem.get_attribute("href")
-                        if href and "/status/" not in href:
-                            username = href.split('/')[-1]
-                            if username and username not in users:
-                                users.append(username)
-                    except:
-                        continue
-                
-                # Scroll down
-                self.browser.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-                time.sleep(2)
-                
-                # Check if we've reached the end
-                new_height = self.browser.execute_script("return document.body.scrollHeight")
-                if new_height == last_height:
-                    break
-                last_height = new_height
-                scrolls += 1
-                
-        except Exception as e:
-            print(f"Error getting users for {tab_name}: {e}")
+            # Scroll down
+            self.browser.execute_script("window.scrollTo(0, document.body.scrollHeight);")
+            self._pause(2)
+            
+            # Check if we've reached the end
+            new_height = self.browser.execute_script("return document.body.scrollHeight")
+            if new_height == last_height:
+                break
+            last_height = new_height
+            scrolls += 1
             
         return users
     
     def get_replies(self):
         """Get usernames of accounts that replied to the tweet"""
         replies = []
-        try:
-            # Scroll down to load replies
-            for _ in range(3):  # Scroll a few times to load more replies
-                self.browser.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-                time.sleep(2)
-            
-            # Find reply elements
-            reply_elements = self.browser.find_elements(By.XPATH, "//article[@data-testid='tweet']")
-            
-            # Skip the first one as it's the original tweet
-            for elem in reply_elements[1:]:
-                try:
-                    # Get username element
-                    username_elem = elem.find_element(By.XPATH, ".//div[@data-testid='User-Name']//a")
-                    username = username_elem.get_attribute("href").split('/')[-1]
-                    
-                    # Check if it's an ad
-                    ad_indicators = elem.find_elements(By.XPATH, ".//span[contains(text(), 'Ad')]")
-                    if not ad_indicators and username not in replies:
-                        replies.append(username)
-                except:
-                    continue
-                    
-        except Exception as e:
-            print(f"Error getting replies: {e}")
-            
+        
+        # Scroll down to load replies
+        for _ in range(3):  # Scroll a few times to load more replies
+            self.browser.execute_script("window.scrollTo(0, document.body.scrollHeight);")
+            self._pause(2)
+        
+        # Find reply elements
+        reply_elements = self.browser.find_elements(By.XPATH, "//article[@data-testid='tweet']")
+        
+        # Skip the first one as it's the original tweet
+        for elem in reply_elements[1:]:
+            try:
+                # Get username element
+                username_elem = elem.find_element(By.XPATH, ".//div[@data-testid='User-Name']//a")
+                username = username_elem.get_attribute("href").split('/')[-1]
+                
+                # Check if it's an ad
+                ad_indicators = elem.find_elements(By.XPATH, ".//span[contains(text(), 'Ad')]")
+                if not ad_indicators and username not in replies:
+                    replies.append(username)
+            except:
+                continue
+                
         return replies
     
     def get_list_members(self, list_url):
         """Get members of a Twitter list"""
         try:
-            self.browser.get(list_url)
-            time.sleep(3)
+            self._load(list_url)
+            self._pause(3)
             
             # Wait for and click on "List members" to see the popup
             members_button = WebDriverWait(self.browser, 10).until(
                 EC.element_to_be_clickable((By.XPATH, "//span[contains(text(), 'List members')]"))
             )
             members_button.click()
-            time.sleep(2)
+            self._pause(2)
             
             members = []
             last_height = 0
@@ -439,7 +784,7 @@ class PersistentTwitter:
                 
                 # Scroll down in the popup
                 self.browser.execute_script("arguments[0].scrollTo(0, arguments[0].scrollHeight);", popup)
-                time.sleep(2)
+                self._pause(2)
                 
                 # Check if we've reached the end
                 new_height = self.browser.execute_script("return arguments[0].scrollHeight", popup)
@@ -0,0 +1,260 @@
+import os
+import re
+import json
+import hashlib
+from abc import ABC, abstractmethod
+from selenium import webdriver
+from selenium.webdriver.chrome.options import Options
+from selenium.common.exceptions import TimeoutException, WebDriverException
+
+
+class ReplayDivergence(Exception):
+    """Raised when a replay navigates somewhere the recording never went"""
+
+
+class RecordedElement:
+    """Wrap a WebElement so clicks and nested lookups go through the session"""
+    
+    def __init__(self, element, session):
+        self._element = element
+        self._session = session
+    
+    def click(self):
+        self._session.click(self._element)
+    
+    def find_element(self, *args, **kwargs):
+        return self._session.wrap(self._element.find_element(*args, **kwargs))
+    
+    def find_elements(self, *args, **kwargs):
+        return [self._session.wrap(elem) for elem in self._element.find_elements(*args, **kwargs)]
+    
+    def __getattr__(self, name):
+        return getattr(self._element, name)
+    
+    def __eq__(self, other):
+        return self._element == getattr(other, "_element", other)
+    
+    def __hash__(self):
+        return hash(self._element)
+
+
+class SessionBrowser(ABC):
+    """
+    Base for browsers that sit between PersistentTwitter and a real WebDriver
+    
+    Page navigation, clicks and scripts are treated as actions. Driver-level element
+    lookups are treated as reads, which see the DOM as it was after the last action.
+    """
+    
+    def __init__(self, driver, session_dir):
+        self.driver = driver
+        self.session_dir = session_dir
+        self.pages_dir = os.path.join(session_dir, "pages")
+        self.events_file = os.path.join(session_dir, "events.jsonl")
+    
+    def wrap(self, element):
+        return RecordedElement(element, self)
+    
+    def find_element(self, *args, **kwargs):
+        self.before_read()
+        return self.wrap(self.driver.find_element(*args, **kwargs))
+    
+    def find_elements(self, *args, **kwargs):
+        self.before_read()
+        return [self.wrap(elem) for elem in self.driver.find_elements(*args, **kwargs)]
+    
+    @abstractmethod
+    def before_read(self):
+        """Make sure the DOM the next lookup sees is the right one"""
+    
+    def __getattr__(self, name):
+        return getattr(self.driver, name)
+
+
+class RecordingBrowser(SessionBrowser):
+    """Pass everything through to a live browser while saving DOM snapshots and API payloads"""
+    
+    def __init__(self, driver, session_dir):
+        super().__init__(driver, session_dir)
+        self.payloads_dir = os.path.join(session_dir, "payloads")
+        os.makedirs(self.pages_dir, exist_ok=True)
+        os.makedirs(self.payloads_dir, exist_ok=True)
+        self.payload_count = len(os.listdir(self.payloads_dir))
+    
+    def _log(self, event):
+        with open(self.events_file, "a") as f:
+            f.write(json.dumps(event) + "\n")
+    
+    def get(self, url):
+        # Failed loads are logged too, so a replay takes the same retry path as the live run
+        try:
+            self.driver.get(url)
+        except Exception as e:
+            self._log({"action": "get", "url": url, "error": type(e).__name__, "message": str(e)})
+            raise
+        self._log({"action": "get", "url": url})
+    
+    def click(self, element):
+        element.click()
+        self._log({"action": "click"})
+    
+    def execute_script(self, script, *args):
+        args = [getattr(arg, "_element", arg) for arg in args]
+        result = self.driver.execute_script(script, *args)
+        
+        # Only plain values can be replayed, element results are read from the DOM instead
+        try:
+            json.dumps(result)
+        except TypeError:
+            result = None
+        
+        self._log({"action": "script", "script": script, "result": result})
+        return result
+    
+    def before_read(self):
+        """Snapshot the DOM the upcoming lookup will see"""
+        html = self.driver.page_source
+        page = hashlib.sha1(html.encode("utf-8")).hexdigest()
+        
+        # Identical DOMs are stored once
+        page_file = os.path.join(self.pages_dir, f"{page}.html")
+        if not os.path.exists(page_file):
+            with open(page_file, "w", encoding="utf-8") as f:
+                f.write(html)
+        
+        self._log({"action": "read", "page": page, "url": self.driver.current_url})
+        self._record_payloads()
+    
+    def _record_payloads(self):
+        """Save the bodies of API responses seen since the last read"""
+        try:
+            entries = self.driver.get_log("performance")
+        except Exception:
+            return
+        
+        for entry in entries:
+            try:
+                message = json.loads(entry["message"])["message"]
+                if message["method"] != "Network.responseReceived":
+                    continue
+                
+                response = message["params"]["response"]
+                if "/i/api/" not in response["url"]:
+                    continue
+                
+                body = self.driver.execute_cdp_cmd(
+                    "Network.getResponseBody", {"requestId": message["params"]["requestId"]}
+                )
+            except Exception:
+                continue
+            
+            self.payload_count += 1
+            payload_file = f"{self.payload_count:06d}.json"
+            with open(os.path.join(self.payloads_dir, payload_file), "w", encoding="utf-8") as f:
+                json.dump({"url": response["url"], "status": response.get("status"), "body": body.get("body")}, f)
+            self._log({"action": "payload", "file": payload_file, "url": response["url"]})
+
+
+class ReplayBrowser(SessionBrowser):
+    """Feed a recorded session back through the extraction code using a headless browser"""
+    
+    def __init__(self, session_dir):
+        options = Options()
+        options.add_argument("--headless=new")
+        options.add_argument("--blink-settings=imagesEnabled=false")
+        super().__init__(webdriver.Chrome(options=options), session_dir)
+        
+        # Keep replays offline, recorded pages still reference the live site's assets
+        try:
+            self.driver.execute_cdp_cmd("Network.enable", {})
+            self.driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": ["http://*", "https://*"]})
+        except Exception as e:
+            print(f"Could not block network access during replay: {e}")
+        
+        with open(self.events_file, "r") as f:
+            self.events = [json.loads(line) for line in f if line.strip()]
+        
+        self.rendered_dir = os.path.join(session_dir, "rendered")
+        os.makedirs(self.rendered_dir, exist_ok=True)
+        self.cursor = 0
+        self.loaded_page = None
+    
+    def _advance(self, action, match=None, warn=True):
+        """
+        Move the cursor past the next event of the given kind
+        
+        Args:
+            action: Event action to look for
+            match: Optional dictionary of fields the event must match
+            warn: Print a warning if no such event is left
+        
+        Returns:
+            The event, or None if the recording has no such event left
+        """
+        for index in range(self.cursor, len(self.events)):
+            event = self.events[index]
+            if event["action"] != action:
+                continue
+            if match and any(event.get(key) != value for key, value in match.items()):
+                continue
+            
+            self.cursor = index + 1
+            return event
+        
+        if warn:
+            print(f"Replay diverged from recording: no '{action}' event left after event {self.cursor}")
+        return None
+    
+    def get(self, url):
+        # Serving another page's DOM would credit its results to the wrong tweet
+        event = self._advance("get", {"url": url}, warn=False)
+        if event is None:
+            raise ReplayDivergence(f"Replay diverged from recording: {url} was not recorded after event {self.cursor}")
+        
+        if event.get("error") == "TimeoutException":
+            raise TimeoutException(event.get("message"))
+        if event.get("error"):
+            raise WebDriverException(event.get("message"))
+    
+    def click(self, element):
+        self._advance("click")
+    
+    def execute_script(self, script, *args):
+        event = self._advance("script", {"script": script})
+        return event["result"] if event else None
+    
+    def before_read(self):
+        """Load the last page captured before the next action"""
+        event = None
+        index = self.cursor
+        while index < len(self.events) and self.events[index]["action"] in ("read", "payload"):
+            if self.events[index]["action"] == "read":
+                event = self.events[index]
+            index += 1
+        
+        if event is None:
+            return
+        
+        self.cursor = index
+        if event["page"] != self.loaded_page:
+            self.driver.get("file://" + self._render(event))
+            self.loaded_page = event["page"]
+    
+    def _render(self, event):
+        """Write a static copy of a recorded page with scripts removed"""
+        rendered_file = os.path.abspath(os.path.join(self.rendered_dir, f"{event['page']}.html"))
+        if os.path.exists(rendered_file):
+            return rendered_file
+        
+        with open(os.path.join(self.pages_dir, f"{event['page']}.html"), "r", encoding="utf-8") as f:
+            html = f.read()
+        
+        html = re.sub(r"<script\b.*?</script>", "", html, flags=re.DOTALL | re.IGNORECASE)
+        
+        # Resolve relative links against the original URL so extracted hrefs match the live run
+        base = f'<base href="{event["url"]}">'
+        html = re.sub(r"<head(\s[^>]*)?>", lambda match: match.group(0) + base, html, count=1, flags=re.IGNORECASE)
+        
+        with open(rendered_file, "w", encoding="utf-8") as f:
+            f.write(html)
+        return rendered_file
@@ -0,0 +1,144 @@
+import json
+from analyze import add_engagements, analyze_engagement, calculate_score, estimate_information_gain, scrape_tweet
+from persistent_twitter import BudgetExhausted, TweetTimeout
+
+
+WEIGHTS = {'likes': 1, 'replies': 5, 'retweets': 10, 'quotes': 15}
+
+
+def test_add_engagements_counts_each_type():
+    engagement_data = {}
+    add_engagements(engagement_data, {'likes': ['alice', 'bob'], 'replies': ['alice']})
+
+    assert engagement_data['alice'] == {'likes': 1, 'replies': 1, 'retweets': 0, 'quotes': 0}
+    assert engagement_data['bob'] == {'likes': 1, 'replies': 0, 'retweets': 0, 'quotes': 0}
+
+
+def test_add_engagements_retracts_and_drops_empty_users():
+    engagement_data = {}
+    add_engagements(engagement_data, {'likes': ['alice', 'bob'], 'retweets': ['alice']})
+    add_engagements(engagement_data, {'likes': ['alice', 'bob']}, delta=-1)
+
+    assert engagement_data == {'alice': {'likes': 0, 'replies': 0, 'retweets': 1, 'quotes': 0}}
+
+
+def test_add_engagements_ignores_errors_key():
+    engagement_data = {}
+    add_engagements(engagement_data, {'likes': ['alice'], 'errors': ['replies: boom']})
+
+    assert list(engagement_data) == ['alice']
+
+
+def test_calculate_score_uses_weights():
+    data = {'likes': 2, 'replies': 1, 'retweets': 1, 'quotes': 1}
+
+    assert calculate_score(data, WEIGHTS) == 2 + 5 + 10 + 15
+
+
+def test_information_gain_counts_new_engagement_since_last_scrape():
+    tweet = {'url': 't1', 'counts': {'likes': 10, 'retweets': 0, 'replies': 0}}
+    history = {'t1': {'scraped_at': 0, 'counts': {'likes': 4, 'retweets': 0, 'replies': 0}, 'engagements': {}}}
+
+    assert estimate_information_gain(tweet, history, WEIGHTS, now=0) == 6
+    assert estimate_information_gain(tweet, {}, WEIGHTS, now=0) == 10
+
+
+def test_information_gain_ages_old_scrapes():
+    tweet = {'url': 't1', 'counts': {'likes': 10, 'retweets': 0, 'replies': 0}}
+    history = {'t1': {'scraped_at': 0, 'counts': dict(tweet['counts']), 'engagements': {}}}
+
+    assert estimate_information_gain(tweet, history, WEIGHTS, now=24 * 3600) == 5
+
+
+def test_information_gain_treats_history_without_engagers_as_unscraped():
+    tweet = {'url': 't1', 'counts': {'likes': 10, 'retweets': 0, 'replies': 0}}
+    history = {'t1': {'scraped_at': 0, 'counts': dict(tweet['counts'])}}
+
+    assert estimate_information_gain(tweet, history, WEIGHTS, now=0) == 10
+
+
+class FakeTwitter:
+    """Returns canned results for get_tweet_engagements, raising any that are exceptions"""
+
+    def __init__(self, results, tweets=()):
+        self.results = list(results)
+        self.tweets = list(tweets)
+        self.navigations = 0
+        self.navigation_limit = None
+        self.calls = []
+
+    def get_profile_tweets(self, count=20):
+        return self.tweets[:count]
+
+    def get_tweet_engagements(self, tweet_url, counts=None, timeout=None):
+        self.calls.append((tweet_url, timeout))
+        result = self.results.pop(0)
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+
+def engagers(**kwargs):
+    return dict({key: [] for key in WEIGHTS}, errors=[], **kwargs)
+
+
+def test_scrape_tweet_retries_timeouts_then_reports_failure():
+    twitter = FakeTwitter([TweetTimeout("slow"), TweetTimeout("slow")])
+    engagements, attempts = scrape_tweet(twitter, {'url': 't1'}, tweet_timeout=5, retries=1)
+
+    assert attempts == 2
+    assert engagements['errors'] == ["timed out after 2 attempts"]
+
+
+def test_scrape_tweet_does_not_start_once_the_budget_is_gone():
+    twitter = FakeTwitter([])
+
+    assert scrape_tweet(twitter, {'url': 't1'}, budget_deadline=0) == (None, 0)
+    assert twitter.calls == []
+
+
+def test_scrape_tweet_reports_timeouts_cut_short_by_the_budget_as_not_collected(monkeypatch):
+    monkeypatch.setattr('analyze.time.time', lambda: 100)
+    twitter = FakeTwitter([TweetTimeout("slow")])
+
+    assert scrape_tweet(twitter, {'url': 't1'}, tweet_timeout=60, budget_deadline=110) == (None, 1)
+    assert twitter.calls == [('t1', 10)]
+
+
+def test_scrape_tweet_reports_navigation_limit_as_not_collected():
+    twitter = FakeTwitter([BudgetExhausted("limit")])
+
+    assert scrape_tweet(twitter, {'url': 't1'}, tweet_timeout=60, retries=3) == (None, 1)
+
+
+def test_budgeted_run_counts_skipped_tweets_from_their_last_scrape(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "data").mkdir()
+    history = {
+        'old': {'scraped_at': 0, 'counts': {'likes': 1}, 'engagements': engagers(likes=['carol'])},
+        'gone': {'scraped_at': 0, 'counts': {'likes': 1}, 'engagements': engagers(likes=['dave'])},
+    }
+    (tmp_path / "data" / "scrape_history.json").write_text(json.dumps(history))
+
+    tweets = [{'url': 'new', 'counts': {'likes': 5}}, {'url': 'old', 'counts': {'likes': 1}}]
+    twitter = FakeTwitter([engagers(likes=['alice']), BudgetExhausted("limit")], tweets)
+    engagement_data = analyze_engagement(twitter, look_back=2, budget_navigations=10)
+
+    assert sorted(engagement_data) == ['alice', 'carol']
+    assert list((tmp_path / "data").glob("failures_*.csv")) == []
+    assert twitter.navigation_limit is None
+
+    saved = json.loads((tmp_path / "data" / "scrape_history.json").read_text())
+    assert sorted(saved) == ['new', 'old']
+    assert saved['new']['engagements']['likes'] == ['alice']
+
+
+def test_empty_poll_leaves_history_and_results_untouched(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "data").mkdir()
+    history = {'old': {'scraped_at': 0, 'counts': {'likes': 1}, 'engagements': engagers(likes=['carol'])}}
+    (tmp_path / "data" / "scrape_history.json").write_text(json.dumps(history))
+
+    assert analyze_engagement(FakeTwitter([]), look_back=2, budget_seconds=30) == {}
+    assert json.loads((tmp_path / "data" / "scrape_history.json").read_text()) == history
+    assert sorted(path.name for path in (tmp_path / "data").iterdir()) == ["scrape_history.json"]
@@ -0,0 +1,109 @@
+import itertools
+import numpy as np
+from engagement_matrix import EngagementMatrix, matrix_file_for
+
+
+def build(tweet_engagements):
+    return EngagementMatrix.from_engagements(tweet_engagements)
+
+
+def test_from_engagements_combines_flags_per_cell():
+    matrix = build({
+        't1': {'likes': ['alice', 'bob'], 'retweets': ['alice']},
+        't2': {'replies': ['bob'], 'quotes': ['bob', 'bob']},
+    })
+    dense = matrix.matrix.toarray()
+
+    assert dense[matrix.user_index['alice']].tolist() == [1 | 4, 0]
+    assert dense[matrix.user_index['bob']].tolist() == [1, 2 | 8]
+
+
+def test_weighted_sums_the_weights_of_each_flag():
+    matrix = build({'t1': {'likes': ['alice'], 'retweets': ['alice']}})
+    weights = {'likes': 1, 'replies': 5, 'retweets': 10, 'quotes': 15}
+
+    assert matrix.weighted(weights).toarray().tolist() == [[11]]
+
+
+def test_save_and_load_round_trip(tmp_path):
+    matrix = build({'t1': {'likes': ['alice']}, 't2': {'replies': ['alice', 'bob']}})
+    loaded = EngagementMatrix.load(matrix.save(str(tmp_path / "matrix.npz")))
+
+    assert loaded.users == matrix.users
+    assert loaded.tweets == matrix.tweets
+    assert (loaded.matrix != matrix.matrix).nnz == 0
+
+
+def test_find_clusters_matches_brute_force_jaccard():
+    rng = np.random.default_rng(0)
+    tweet_engagements = {f't{i}': {'likes': []} for i in range(40)}
+
+    # A ring liking the same 10 tweets, one member missing one of them
+    for user in ['ring1', 'ring2', 'ring3', 'ring4']:
+        for i in range(10):
+            if not (user == 'ring4' and i == 0):
+                tweet_engagements[f't{i}']['likes'].append(user)
+    for user in range(200):
+        for i in rng.choice(40, size=rng.integers(1, 12), replace=False):
+            tweet_engagements[f't{i}']['likes'].append(f'user{user}')
+    matrix = build(tweet_engagements)
+
+    clusters = matrix.find_clusters(min_similarity=0.8, min_tweets=3, min_size=2, chunk_size=16)
+
+    # Every user sharing a cluster with a ring member must be linked to the ring by exact Jaccard
+    sets = {user: set(matrix.binary()[index].indices) for user, index in matrix.user_index.items()}
+    linked = {
+        frozenset((a, b)) for a, b in itertools.combinations([u for u, s in sets.items() if len(s) >= 3], 2)
+        if len(sets[a] & sets[b]) / len(sets[a] | sets[b]) >= 0.8
+    }
+    expected = {member for pair in linked for member in pair}
+
+    assert {'ring1', 'ring2', 'ring3', 'ring4'} <= set(clusters[0])
+    assert {member for cluster in clusters for member in cluster} == expected
+
+
+def test_find_clusters_groups_accounts_with_identical_tweet_sets():
+    tweet_engagements = {f't{i}': {'likes': ['a', 'b', 'c']} for i in range(3)}
+    tweet_engagements['t3'] = {'likes': ['d']}
+    matrix = build(tweet_engagements)
+
+    assert [sorted(cluster) for cluster in matrix.find_clusters()] == [['a', 'b', 'c']]
+
+
+def test_find_clusters_links_pairs_exactly_at_the_threshold():
+    # 7 shared tweets out of 10 is a Jaccard similarity of exactly 0.7
+    tweet_engagements = {f't{i}': {'likes': ['a', 'b']} for i in range(7)}
+    tweet_engagements.update({f'u{i}': {'likes': ['a']} for i in range(3)})
+    matrix = build(tweet_engagements)
+
+    assert [sorted(cluster) for cluster in matrix.find_clusters(min_similarity=0.7, min_size=2)] == [['a', 'b']]
+
+
+def test_find_clusters_ignores_users_below_min_tweets():
+    matrix = build({'t1': {'likes': ['a', 'b', 'c']}, 't2': {'likes': ['a', 'b', 'c']}})
+
+    assert matrix.find_clusters(min_tweets=3) == []
+
+
+def test_similar_users_ranks_by_overlap():
+    matrix = build({
+        't1': {'likes': ['alice', 'bob', 'carol']},
+        't2': {'likes': ['alice', 'bob']},
+        't3': {'likes': ['carol']},
+    })
+
+    assert [user for user, _ in matrix.similar_users('alice')] == ['bob', 'carol']
+    assert matrix.similar_users('nobody') == []
+
+
+def test_audience_overlap_is_jaccard_of_tweet_audiences():
+    matrix = build({'t1': {'likes': ['a', 'b']}, 't2': {'likes': ['b', 'c']}, 't3': {}})
+    overlap = matrix.audience_overlap()
+
+    assert overlap[0, 1] == overlap[1, 0] == 1 / 3
+    assert overlap[0, 0] == 1
+    assert overlap[2, 2] == 0
+
+
+def test_matrix_file_for_uses_the_engagers_timestamp():
+    assert matrix_file_for("data/engagers_20240101_120000.csv") == "data/engagement_matrix_20240101_120000.npz"
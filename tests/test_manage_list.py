@@ -0,0 +1,36 @@
+from manage_list import recommend_list_changes
+
+
+def rows(*scores):
+    return [{'username': username, 'total_score': score} for username, score in scores]
+
+
+def test_fills_open_slots_with_top_candidates():
+    engagement_data = rows(('a', 50), ('b', 40), ('c', 30))
+    result = recommend_list_changes(['m'], engagement_data, [], [], 3)
+
+    assert result['remove'] == []
+    assert result['result'] == ['m', 'a', 'b']
+
+
+def test_removes_lowest_scoring_members_but_keeps_whitelist():
+    engagement_data = rows(('x', 50), ('y', 10))
+    result = recommend_list_changes(['w', 'x', 'y', 'z'], engagement_data, ['w'], [], 2)
+
+    assert result['keep'] == ['w', 'x']
+    assert sorted(result['remove']) == ['y', 'z']
+
+
+def test_never_adds_blacklisted_users():
+    engagement_data = rows(('bad', 100), ('good', 1))
+    result = recommend_list_changes([], engagement_data, [], ['bad'], 1)
+
+    assert result['result'] == ['good']
+
+
+def test_adds_at_most_one_account_per_cluster():
+    engagement_data = rows(('bot1', 90), ('bot2', 80), ('human', 10))
+    clusters = {'bot1': 0, 'bot2': 0}
+    result = recommend_list_changes([], engagement_data, [], [], 2, clusters=clusters)
+
+    assert result['result'] == ['bot1', 'human']
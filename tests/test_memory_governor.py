@@ -0,0 +1,96 @@
+import pytest
+
+from memory_governor import MemoryGovernor
+
+
+class FakeSwitchTo:
+    def __init__(self, browser):
+        self.browser = browser
+
+    def new_window(self, kind):
+        self.browser.handles += 1
+        self.browser.current_window_handle = self.browser.handles
+
+    def window(self, handle):
+        self.browser.current_window_handle = handle
+
+
+class FakeBrowser:
+    def __init__(self):
+        self.handles = 1
+        self.current_window_handle = 1
+        self.switch_to = FakeSwitchTo(self)
+        self.closed = []
+
+    def close(self):
+        self.closed.append(self.current_window_handle)
+
+    def execute_cdp_cmd(self, command, params):
+        return {"usedSize": 0}
+
+
+class FakeTwitter:
+    def __init__(self):
+        self.pid = None
+        self.browser = FakeBrowser()
+        self.restarts = 0
+
+    def restart_browser(self):
+        self.restarts += 1
+        return True
+
+
+@pytest.fixture
+def governor(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    return MemoryGovernor(FakeTwitter(), max_memory_mb=100, max_pages_per_tab=1000,
+                          sample_interval=1, cooldown_pages=10)
+
+
+def test_recycles_tab_after_page_limit(governor):
+    governor.max_pages_per_tab = 2
+    for _ in range(3):
+        governor.before_navigation()
+
+    assert governor.recycles == 1
+    assert governor.twitter.browser.closed == [1]
+    assert governor.twitter.browser.current_window_handle == 2
+
+
+def test_memory_that_recycling_cannot_free_escalates_once_then_cools_down(governor, monkeypatch):
+    monkeypatch.setattr(governor, "get_renderer_memory_mb", lambda: 500)
+    for _ in range(10):
+        governor.before_navigation()
+
+    assert governor.recycles == 1
+    assert governor.twitter.restarts == 1
+
+    governor.before_navigation()
+
+    assert governor.recycles == 2
+    assert governor.twitter.restarts == 2
+
+
+def test_recycle_that_frees_memory_does_not_restart(governor, monkeypatch):
+    readings = iter([500, 50])
+    monkeypatch.setattr(governor, "get_renderer_memory_mb", lambda: next(readings, 50))
+    governor.before_navigation()
+
+    assert governor.recycles == 1
+    assert governor.twitter.restarts == 0
+
+
+def test_recycle_waits_for_the_old_renderers_before_sampling(governor, monkeypatch):
+    events = []
+    old_renderers = [object()]
+    monkeypatch.setattr(governor, "get_renderer_processes", lambda: old_renderers)
+
+    def wait_procs(processes, timeout):
+        events.append(("wait", processes, timeout))
+        return processes, []
+
+    monkeypatch.setattr("memory_governor.psutil.wait_procs", wait_procs)
+    monkeypatch.setattr(governor, "sample", lambda action="": events.append(("sample", action)))
+    governor.recycle_tab("test")
+
+    assert events == [("wait", old_renderers, 3), ("sample", "recycled: test")]
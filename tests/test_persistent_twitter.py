@@ -0,0 +1,225 @@
+import json
+import socket
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, HTTPServer
+import pytest
+from persistent_twitter import BudgetExhausted, PersistentTwitter, DEFAULT_PAGE_LOAD_TIMEOUT, DEFAULT_SCRIPT_TIMEOUT
+
+
+class FakeButton:
+    def __init__(self, label):
+        self.label = label
+
+    def get_attribute(self, name):
+        return self.label
+
+
+class FakeTweetElement:
+    """Tweet article with engagement buttons keyed by data-testid"""
+
+    def __init__(self, buttons):
+        self.buttons = buttons
+
+    def find_elements(self, by, xpath):
+        for test_id, label in self.buttons.items():
+            if f"'{test_id}'" in xpath:
+                return [FakeButton(label)]
+        return []
+
+
+class OfflineTwitter(PersistentTwitter):
+    """PersistentTwitter with the browser-facing steps replaced by canned results"""
+
+    def __init__(self, tabs):
+        super().__init__()
+        self.tabs = tabs
+        self.visited_tabs = []
+        self.loads = 0
+
+    def _start_deadline(self, timeout):
+        pass
+
+    def _clear_deadline(self):
+        pass
+
+    def _load(self, url):
+        self.loads += 1
+
+    def _pause(self, seconds):
+        pass
+
+    def _open_post_engagements(self):
+        pass
+
+    def _get_engagement_tabs(self):
+        return self.tabs
+
+    def get_user_list(self, tab_name):
+        self.visited_tabs.append(tab_name)
+        return [tab_name]
+
+    def get_replies(self):
+        return ["replier"]
+
+
+def test_counts_are_read_from_aria_labels():
+    elem = FakeTweetElement({'reply': "3 Replies. Reply", 'retweet': "Repost", 'unlike': "1,204 Likes. Liked"})
+
+    assert PersistentTwitter()._get_tweet_counts(elem) == {'replies': 3, 'retweets': 0, 'likes': 1204}
+
+
+def test_unreadable_counts_are_none():
+    elem = FakeTweetElement({'like': "something new"})
+
+    assert PersistentTwitter()._get_tweet_counts(elem) == {'replies': None, 'retweets': None, 'likes': None}
+
+
+def test_zero_counters_skip_tabs_and_replies():
+    twitter = OfflineTwitter(["Liked by", "Reposted by", "Quoted"])
+    engagements = twitter.get_tweet_engagements("url", counts={'replies': 0, 'retweets': 0, 'likes': 2})
+
+    assert twitter.visited_tabs == ["Liked by"]
+    assert engagements['replies'] == []
+    assert engagements['errors'] == []
+
+
+def test_unknown_counters_are_collected():
+    twitter = OfflineTwitter(["Liked by", "Reposted by", "Quoted"])
+    engagements = twitter.get_tweet_engagements("url", counts={'replies': None, 'retweets': None, 'likes': None})
+
+    assert twitter.visited_tabs == ["Liked by", "Reposted by", "Quoted"]
+    assert engagements['replies'] == ["replier"]
+
+
+def test_all_zero_counters_skip_the_tweet():
+    twitter = OfflineTwitter([])
+    twitter.get_tweet_engagements("url", counts={'replies': 0, 'retweets': 0, 'likes': 0})
+
+    assert twitter.loads == 0
+
+
+def test_missing_tab_with_engagement_is_an_error():
+    twitter = OfflineTwitter(["Quoted"])
+    engagements = twitter.get_tweet_engagements("url", counts={'replies': 0, 'retweets': 4, 'likes': 7})
+
+    assert twitter.visited_tabs == ["Quoted"]
+    assert engagements['errors'] == ["likes: tab not shown despite 7 likes"]
+
+
+def test_load_refuses_navigation_past_the_limit():
+    class FakeBrowser:
+        def __init__(self):
+            self.urls = []
+
+        def get(self, url):
+            self.urls.append(url)
+
+    twitter = PersistentTwitter()
+    twitter.browser = FakeBrowser()
+    twitter.navigation_limit = 1
+    twitter._load("https://twitter.com/a")
+
+    with pytest.raises(BudgetExhausted):
+        twitter._load("https://twitter.com/b")
+    assert twitter.browser.urls == ["https://twitter.com/a"]
+
+
+class CookieBrowser:
+    def __init__(self, cookies):
+        self.cookies = cookies
+
+    def execute_cdp_cmd(self, cmd, params):
+        return {'cookies': self.cookies}
+
+
+def logged_in_with(*cookies):
+    twitter = PersistentTwitter()
+    twitter.browser = CookieBrowser(list(cookies))
+    return twitter.is_logged_in()
+
+
+def test_is_logged_in_accepts_unexpired_and_session_auth_tokens():
+    assert logged_in_with({'name': 'auth_token', 'domain': '.x.com', 'expires': time.time() + 3600})
+    assert logged_in_with({'name': 'auth_token', 'domain': 'twitter.com', 'expires': -1})
+
+
+def test_is_logged_in_rejects_expired_tokens():
+    assert not logged_in_with({'name': 'auth_token', 'domain': '.x.com', 'expires': time.time() - 3600})
+
+
+def test_is_logged_in_ignores_other_domains_and_cookies():
+    assert not logged_in_with(
+        {'name': 'auth_token', 'domain': '.notx.com', 'expires': -1},
+        {'name': 'auth_token', 'domain': 'api.example.com', 'expires': -1},
+        {'name': 'ct0', 'domain': '.x.com', 'expires': -1},
+    )
+
+
+def closed_port():
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def test_wait_for_devtools_times_out_on_a_closed_port():
+    twitter = PersistentTwitter()
+    twitter.port = closed_port()
+
+    started = time.time()
+    assert twitter._wait_for_devtools(timeout=0.3, interval=0.05) is False
+    assert time.time() - started < 2
+
+
+class VersionHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        body = json.dumps({'Browser': 'Chrome'}).encode()
+        self.send_response(200)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def test_wait_for_devtools_reads_the_port_file_and_bypasses_proxies(tmp_path, monkeypatch):
+    # A proxy that doesn't exist would make every poll fail if it were used
+    monkeypatch.setenv('http_proxy', f'http://127.0.0.1:{closed_port()}')
+    monkeypatch.setenv('HTTP_PROXY', f'http://127.0.0.1:{closed_port()}')
+    server = HTTPServer(('127.0.0.1', 0), VersionHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    try:
+        twitter = PersistentTwitter()
+        twitter.user_data_dir = str(tmp_path)
+        (tmp_path / "DevToolsActivePort").write_text(f"{server.server_port}\n/devtools/browser/abc\n")
+
+        assert twitter._wait_for_devtools(timeout=2, read_port=True) is True
+        assert twitter.port == server.server_port
+    finally:
+        server.shutdown()
+
+
+class TimeoutBrowser:
+    def __init__(self):
+        self.timeouts = []
+
+    def set_page_load_timeout(self, seconds):
+        self.timeouts.append(('page_load', seconds))
+
+    def set_script_timeout(self, seconds):
+        self.timeouts.append(('script', seconds))
+
+
+def test_deadline_caps_page_loads_and_scripts_then_restores_defaults():
+    twitter = PersistentTwitter()
+    twitter.browser = TimeoutBrowser()
+
+    twitter._start_deadline(20)
+    twitter._clear_deadline()
+
+    assert twitter.browser.timeouts == [
+        ('page_load', 20), ('script', 20),
+        ('page_load', DEFAULT_PAGE_LOAD_TIMEOUT), ('script', DEFAULT_SCRIPT_TIMEOUT),
+    ]
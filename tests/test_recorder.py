@@ -0,0 +1,73 @@
+import json
+
+import pytest
+
+from selenium.common.exceptions import TimeoutException
+
+from recorder import RecordingBrowser, ReplayBrowser, ReplayDivergence, SessionBrowser
+
+
+def make_replay(tmp_path, events):
+    """Build a ReplayBrowser over recorded events without starting a headless browser"""
+    with open(tmp_path / "events.jsonl", "w") as f:
+        for event in events:
+            f.write(json.dumps(event) + "\n")
+
+    replay = ReplayBrowser.__new__(ReplayBrowser)
+    SessionBrowser.__init__(replay, None, str(tmp_path))
+    with open(replay.events_file) as f:
+        replay.events = [json.loads(line) for line in f]
+    replay.cursor = 0
+    replay.loaded_page = None
+    return replay
+
+
+def test_get_follows_recorded_navigation(tmp_path):
+    replay = make_replay(tmp_path, [
+        {"action": "get", "url": "https://twitter.com/a"},
+        {"action": "script", "script": "return 1", "result": 1},
+        {"action": "get", "url": "https://twitter.com/b"},
+    ])
+
+    replay.get("https://twitter.com/a")
+    assert replay.execute_script("return 1") == 1
+    replay.get("https://twitter.com/b")
+
+
+def test_get_of_unrecorded_url_fails(tmp_path):
+    replay = make_replay(tmp_path, [{"action": "get", "url": "https://twitter.com/a"}])
+
+    with pytest.raises(ReplayDivergence):
+        replay.get("https://twitter.com/other")
+
+
+def test_session_browser_requires_before_read():
+    with pytest.raises(TypeError):
+        SessionBrowser(None, "unused")
+
+
+class FlakyDriver:
+    """Driver whose first page load times out"""
+
+    def __init__(self):
+        self.loads = 0
+
+    def get(self, url):
+        self.loads += 1
+        if self.loads == 1:
+            raise TimeoutException("page load timed out")
+
+
+def test_timed_out_navigation_replays_the_same_retry(tmp_path):
+    recording = RecordingBrowser(FlakyDriver(), str(tmp_path / "recorded"))
+    with pytest.raises(TimeoutException):
+        recording.get("https://twitter.com/a")
+    recording.get("https://twitter.com/a")
+
+    with open(recording.events_file) as f:
+        events = [json.loads(line) for line in f]
+    replay = make_replay(tmp_path, events)
+
+    with pytest.raises(TimeoutException):
+        replay.get("https://twitter.com/a")
+    replay.get("https://twitter.com/a")
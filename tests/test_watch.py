@@ -0,0 +1,78 @@
+import pytest
+
+from watch import EngagementWatcher
+
+
+class FakeTwitter:
+    """Serves canned timelines and engagements instead of scraping"""
+
+    def __init__(self):
+        self.timeline = []
+        self.engagements = {}
+        self.list_members = []
+        self.list_fetches = 0
+
+    def get_profile_tweets(self, count=20):
+        return self.timeline[:count]
+
+    def get_tweet_engagements(self, tweet_url, counts=None, timeout=None):
+        return dict(self.engagements[tweet_url], errors=[])
+
+    def get_list_members(self, list_url):
+        self.list_fetches += 1
+        return list(self.list_members)
+
+
+def tweet(url, likes):
+    return {'url': url, 'counts': {'replies': 0, 'retweets': 0, 'likes': likes}}
+
+
+@pytest.fixture
+def watcher(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    twitter = FakeTwitter()
+    return EngagementWatcher(twitter, look_back=1, output_file=str(tmp_path / "watch.jsonl"))
+
+
+def test_only_changed_tweets_are_rescraped(watcher):
+    watcher.twitter.timeline = [tweet('t1', 1)]
+    watcher.twitter.engagements = {'t1': {'likes': ['alice']}}
+
+    assert watcher.run_cycle() == ['t1']
+    assert watcher.run_cycle() == []
+
+
+def test_tweets_leaving_the_window_are_retracted(watcher):
+    watcher.twitter.timeline = [tweet('old', 1)]
+    watcher.twitter.engagements = {'old': {'likes': ['alice']}, 'new': {'likes': ['bob']}}
+    watcher.run_cycle()
+
+    watcher.twitter.timeline = [tweet('new', 1), tweet('old', 1)]
+    watcher.run_cycle()
+
+    assert list(watcher.engagement_data) == ['bob']
+    assert list(watcher.tweet_engagements) == ['new']
+    assert list(watcher.tweet_counts) == ['new']
+
+
+def test_empty_poll_keeps_the_leaderboard(watcher):
+    watcher.twitter.timeline = [tweet('t1', 1)]
+    watcher.twitter.engagements = {'t1': {'likes': ['alice']}}
+    watcher.run_cycle()
+
+    watcher.twitter.timeline = []
+    watcher.run_cycle()
+
+    assert list(watcher.engagement_data) == ['alice']
+
+
+def test_list_members_are_refreshed(watcher):
+    watcher.target_list_link = "https://twitter.com/i/lists/1"
+    watcher.twitter.engagements = {'t1': {'likes': ['alice']}, 't2': {'likes': ['bob']}}
+
+    watcher.twitter.timeline = [tweet('t1', 1)]
+    watcher.run_cycle()
+    watcher.twitter.timeline = [tweet('t2', 1)]
+    watcher.run_cycle()
+
+    assert watcher.twitter.list_fetches == 2
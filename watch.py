@@ -0,0 +1,230 @@
+import os
+import json
+import time
+import datetime
+from persistent_twitter import PersistentTwitter
+from engagement_matrix import EngagementMatrix, matrix_file_for
+from analyze import ENGAGEMENT_TYPES, add_engagements, calculate_score, get_score_weights, save_engagement_data, scrape_tweet
+from manage_list import load_whitelist, load_blacklist, recommend_list_changes
+
+
+class EngagementWatcher:
+    """Keep a live engagement leaderboard up to date by only re-scraping tweets that changed"""
+    
+    def __init__(self, twitter, look_back=20, list_size=10, target_list_link=None, output_file=None,
+                 tweet_timeout=60, retries=1, list_refresh_cycles=1):
+        self.twitter = twitter
+        self.look_back = look_back
+        self.tweet_timeout = tweet_timeout
+        self.retries = retries
+        self.list_size = list_size
+        self.target_list_link = target_list_link
+        self.weights = get_score_weights()
+        
+        # Last counters seen for each tweet and the engagers behind them
+        self.tweet_counts = {}
+        self.tweet_engagements = {}
+        
+        # Per-user counters, same shape as analyze_engagement's result
+        self.engagement_data = {}
+        
+        # Current list members, refetched every list_refresh_cycles cycles so edits are picked up
+        self.list_members = None
+        self.list_refresh_cycles = list_refresh_cycles
+        self.list_fetched_cycle = None
+        self.whitelist = load_whitelist()
+        self.blacklist = load_blacklist()
+        
+        if output_file is None:
+            os.makedirs('data', exist_ok=True)
+            timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+            output_file = f"data/watch_{timestamp}.jsonl"
+        self.output_file = output_file
+        self.cycle = 0
+    
+    def find_changed_tweets(self):
+        """
+        Poll the profile, drop tweets that left the LOOK_BACK window and find the ones that changed
+        
+        Returns:
+            Tuple of the tweet dictionaries that need to be re-scraped and the URLs that were dropped
+        """
+        tweets = self.twitter.get_profile_tweets(count=self.look_back)
+        
+        # An empty poll is a failed poll, don't retract the whole leaderboard because of it
+        dropped = self.retract_tweets({tweet['url'] for tweet in tweets}) if tweets else []
+        
+        changed = [tweet for tweet in tweets if self.tweet_counts.get(tweet['url']) != tweet['counts']]
+        return changed, dropped
+    
+    def retract_tweets(self, current_urls):
+        """
+        Remove the engagements of tracked tweets that are no longer in the LOOK_BACK window
+        
+        Args:
+            current_urls: URLs of the tweets returned by the latest poll
+            
+        Returns:
+            List of tweet URLs that were retracted
+        """
+        dropped = [url for url in self.tweet_engagements if url not in current_urls]
+        for url in dropped:
+            add_engagements(self.engagement_data, self.tweet_engagements.pop(url), delta=-1)
+            self.tweet_counts.pop(url, None)
+            
+        # Tweets that were never collected successfully only have counters to forget
+        for url in [url for url in self.tweet_counts if url not in current_urls]:
+            del self.tweet_counts[url]
+            
+        return dropped
+    
+    def update_tweet(self, tweet):
+        """
+        Scrape a tweet's engagements and apply only the difference to the leaderboard
+        
+        Args:
+            tweet: Tweet dictionary from get_profile_tweets
+        
+        Returns:
+            True if the tweet was updated
+        """
+        engagements, _ = scrape_tweet(self.twitter, tweet, self.tweet_timeout, self.retries)
+        
+        # Applying a partial scrape would retract real engagements, so keep the old
+        # data and leave the counters stale so the tweet is retried next cycle
+        if engagements['errors']:
+            print(f"Could not fully collect {tweet['url']}, will retry next cycle")
+            return False
+        
+        previous = self.tweet_engagements.get(tweet['url'], {key: set() for key in ENGAGEMENT_TYPES})
+        current = {key: set(engagements.get(key, [])) for key in ENGAGEMENT_TYPES}
+        
+        add_engagements(self.engagement_data, {key: current[key] - previous[key] for key in ENGAGEMENT_TYPES})
+        add_engagements(self.engagement_data, {key: previous[key] - current[key] for key in ENGAGEMENT_TYPES}, delta=-1)
+        
+        self.tweet_engagements[tweet['url']] = current
+        self.tweet_counts[tweet['url']] = tweet['counts']
+        return True
+    
+    def get_leaderboard(self):
+        """
+        Rank users by total score
+        
+        Returns:
+            List of engagement rows sorted by total score in descending order
+        """
+        leaderboard = [
+            dict(data, username=username, total_score=calculate_score(data, self.weights))
+            for username, data in self.engagement_data.items()
+        ]
+        leaderboard.sort(key=lambda x: x['total_score'], reverse=True)
+        return leaderboard
+    
+    def emit(self, record):
+        """Append a record to the JSONL output stream"""
+        with open(self.output_file, 'a') as f:
+            f.write(json.dumps(record) + "\n")
+            f.flush()
+    
+    def run_cycle(self, leaderboard_size=50):
+        """
+        Run one poll cycle and emit updated rankings if anything changed
+        
+        Args:
+            leaderboard_size: Number of top users to include in each emitted record
+        
+        Returns:
+            List of tweet URLs that were updated
+        """
+        self.cycle += 1
+        changed, dropped = self.find_changed_tweets()
+        print(f"Cycle {self.cycle}: {len(changed)} tweets changed, {len(dropped)} tweets left the window")
+        
+        updated = [tweet['url'] for tweet in changed if self.update_tweet(tweet)]
+        if not updated and not dropped:
+            return updated
+        
+        leaderboard = self.get_leaderboard()
+        record = {
+            'timestamp': datetime.datetime.now().isoformat(),
+            'cycle': self.cycle,
+            'updated_tweets': updated,
+            'dropped_tweets': dropped,
+            'leaderboard': leaderboard[:leaderboard_size],
+        }
+        
+        if self.target_list_link:
+            self.refresh_list_members()
+            recommendations = recommend_list_changes(
+                self.list_members, leaderboard, self.whitelist, self.blacklist, self.list_size
+            )
+            record['recommendations'] = {
+                'remove': recommendations['remove'],
+                'add': [user['username'] for user in recommendations['add']],
+                'result': recommendations['result'],
+            }
+        
+        self.emit(record)
+        return updated
+    
+    def refresh_list_members(self):
+        """Refetch the target list's members if they are missing or older than list_refresh_cycles"""
+        if self.list_members is not None and self.cycle - self.list_fetched_cycle < self.list_refresh_cycles:
+            return
+        
+        members = self.twitter.get_list_members(self.target_list_link)
+        
+        # get_list_members returns an empty list on errors, keep the last good fetch then
+        if members or self.list_members is None:
+            self.list_members = members
+        self.list_fetched_cycle = self.cycle
+    
+    def run(self, interval=300, leaderboard_size=50, max_cycles=None):
+        """
+        Poll on a schedule until interrupted
+        
+        Args:
+            interval: Seconds between the start of consecutive cycles
+            leaderboard_size: Number of top users to include in each emitted record
+            max_cycles: Stop after this many cycles (runs forever if None)
+        """
+        print(f"Watching the last {self.look_back} tweets every {interval}s, streaming to {self.output_file}")
+        
+        try:
+            while max_cycles is None or self.cycle < max_cycles:
+                started = time.time()
+                self.run_cycle(leaderboard_size)
+                time.sleep(max(0, interval - (time.time() - started)))
+        except KeyboardInterrupt:
+            print("Stopping watch mode")
+        finally:
+            # Leave a regular snapshot behind so manage_list can pick it up
+            if self.engagement_data:
+                engagement_file = save_engagement_data(self.engagement_data)
+                EngagementMatrix.from_engagements(self.tweet_engagements).save(matrix_file_for(engagement_file))
+
+def run_watch():
+    """Run continuous watch mode"""
+    look_back = int(os.getenv("LOOK_BACK", 20))
+    list_size = int(os.getenv("LIST_SIZE", 10))
+    interval = int(os.getenv("WATCH_INTERVAL", 300))
+    leaderboard_size = int(os.getenv("WATCH_LEADERBOARD_SIZE", 50))
+    
+    # Initialize Twitter
+    twitter = PersistentTwitter()
+    twitter.initialize()
+    
+    watcher = EngagementWatcher(
+        twitter,
+        look_back=look_back,
+        list_size=list_size,
+        target_list_link=os.getenv("TARGET_LIST_LINK"),
+        output_file=os.getenv("WATCH_OUTPUT") or None,
+        tweet_timeout=int(os.getenv("TWEET_TIMEOUT", 60)),
+        retries=int(os.getenv("TWEET_RETRIES", 1)),
+        list_refresh_cycles=int(os.getenv("WATCH_LIST_REFRESH_CYCLES", 1))
+    )
+    watcher.run(interval=interval, leaderboard_size=leaderboard_size)
+
+if __name__ == "__main__":
+    run_watch()